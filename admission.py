@@ -0,0 +1,148 @@
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from fastapi import HTTPException, Request
+
+from metrics import Counter
+
+# Admission control at the edge: per-client token buckets and request-body limits.
+
+ADMISSION_REJECTED = Counter(
+    "poap_admission_rejected_total", "Requests turned away before reaching any upstream", ("reason",)
+)
+
+class RateLimiter:
+    """
+    Token bucket per client key, refilled at `rate` tokens per second up to
+    `burst`. A request costing more than one token is admitted once the
+    bucket holds `min(cost, burst)`, and may drive the balance negative, so
+    a large batch is allowed but the client then waits for it to be repaid.
+
+    Buckets are per process; the least recently seen clients are dropped
+    beyond `max_clients`, which only ever forgives them.
+    """
+    def __init__(self, name: str, rate: float, burst: float, max_clients: int = 10000):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()  # key -> (tokens, last refill)
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, cost: float = 1, prepaid: float = 0) -> float:
+        """
+        Take `cost` tokens for `key`, less `prepaid` ones already taken for
+        the same request. Returns 0 if admitted, else seconds until it would be.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            needed = min(cost, self.burst) - prepaid
+            if tokens >= needed:
+                tokens -= cost - prepaid
+                wait = 0.0
+            else:
+                wait = (needed - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def check(self, key: str, cost: float = 1, prepaid: float = 0):
+        """`acquire`, raising 429 with Retry-After when the client is over its limit."""
+        if cost <= prepaid:
+            return
+        wait = self.acquire(key, cost, prepaid)
+        if wait > 0:
+            ADMISSION_REJECTED.inc(reason=self.name)
+            raise HTTPException(
+                status_code=429, detail=f"Rate limit exceeded; retry in {math.ceil(wait)}s",
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+
+async def send_error(send, status: int, detail: str, headers: Optional[Dict[str, str]] = None):
+    """
+    Answer from middleware before the request body has been read. The
+    connection is closed, since the unread body is still on it.
+    """
+    body = json.dumps({"detail": detail}).encode()
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+        (b"connection", b"close"),
+        *((name.lower().encode(), value.encode()) for name, value in (headers or {}).items()),
+    ]})
+    await send({"type": "http.response.body", "body": body})
+
+class RateLimit:
+    """
+    ASGI middleware charging every request one token from the limiter for
+    its path prefix, with 429 and Retry-After, before the body is read: a
+    client over its limit uploads nothing. Routes whose cost depends on the
+    body charge the rest themselves with `RateLimiter.check(..., prepaid=1)`.
+    """
+    def __init__(self, app, limiters: Dict[str, RateLimiter], client_key: Callable[[Request], str]):
+        self.app = app
+        self.limiters = limiters
+        self.client_key = client_key
+
+    def limiter_for(self, path: str):
+        for prefix, limiter in self.limiters.items():
+            if path.startswith(prefix):
+                return limiter
+        return None
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.limiter_for(scope["path"]) if scope["type"] == "http" else None
+        if limiter is not None:
+            wait = limiter.acquire(self.client_key(Request(scope)))
+            if wait > 0:
+                ADMISSION_REJECTED.inc(reason=limiter.name)
+                return await send_error(send, 429, f"Rate limit exceeded; retry in {math.ceil(wait)}s",
+                                        {"Retry-After": str(math.ceil(wait))})
+        await self.app(scope, receive, send)
+
+class BodySizeLimit:
+    """
+    ASGI middleware capping request bodies per path prefix, with 413. A
+    declared Content-Length over the limit is refused before the body is
+    read; chunked bodies are counted as they arrive.
+    """
+    def __init__(self, app, default: int, limits: Dict[str, int]):
+        self.app = app
+        self.default = default
+        self.limits = limits
+
+    def limit_for(self, path: str) -> int:
+        for prefix, limit in self.limits.items():
+            if path.startswith(prefix):
+                return limit
+        return self.default
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        limit = self.limit_for(scope["path"])
+        declared = dict(scope["headers"]).get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > limit:
+            ADMISSION_REJECTED.inc(reason="body_size")
+            return await send_error(send, 413, f"Request body is larger than {limit} bytes")
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    ADMISSION_REJECTED.inc(reason="body_size")
+                    # Raised inside body parsing, which FastAPI turns into the response
+                    raise HTTPException(status_code=413, detail=f"Request body is larger than {limit} bytes")
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,375 @@
+"""
+Local stand-in for algod and the indexer, speaking enough of their v2 REST
+APIs for main.py: suggested params, submitting signed transactions and
+groups, status / wait-for-block, pending info, blocks and their txids,
+asset lookups, and the indexer asset, transaction and asset-transaction
+searches.
+
+Submitted transactions sit in a pool until the next block, which is cut
+every `block_time` seconds; every request sleeps for `latency` first. Both
+servers share one in-memory ledger.
+
+    python benchmarks/fake_algorand.py --latency 0.02 --block-time 1
+"""
+import argparse
+import base64
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import msgpack
+from algosdk.transaction import SignedTransaction
+
+GENESIS_ID = "benchnet-v1.0"
+GENESIS_HASH = base64.b64encode(b"benchnet-genesis-hash-0000000000").decode()
+
+
+ROLE_FIELDS = ("manager", "reserve", "freeze", "clawback")
+
+
+def b64(value):
+    return base64.b64encode(value).decode() if value else None
+
+
+class FakeLedger:
+    """In-memory chain: a transaction pool confirmed one block at a time."""
+
+    def __init__(self, block_time: float, first_round: int = 1000):
+        self.block_time = block_time
+        self.round = first_round
+        self.next_asset_id = 10_000_000
+        self.pending = {}        # txid -> (round submitted, SignedTransaction)
+        self.confirmed = {}      # txid -> pending-transaction-info response
+        self.assets = {}         # asset id -> indexer asset record
+        self.acfg_txns = []      # indexer transaction records, in confirmation order
+        self.blocks = {}         # round -> [(txid, block transaction record)]
+        self.cond = threading.Condition()
+        self._stop = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.block_time):
+            self.cut_block()
+
+    def cut_block(self):
+        with self.cond:
+            self.round += 1
+            self.blocks[self.round] = []
+            for txid, (_, stxn) in list(self.pending.items()):
+                self._confirm(txid, stxn.transaction)
+            self.pending.clear()
+            self.cond.notify_all()
+
+    def _confirm(self, txid, txn):
+        info = {"confirmed-round": self.round, "pool-error": "", "txn": {"txn": {"type": txn.type}}}
+        if txn.type == "acfg" and not txn.index:
+            asset_id = self.next_asset_id
+            self.next_asset_id += 1
+            params = {
+                "creator": txn.sender,
+                "total": txn.total,
+                "decimals": txn.decimals,
+                "default-frozen": bool(txn.default_frozen),
+                "unit-name": txn.unit_name,
+                "name": txn.asset_name,
+                "url": txn.url,
+                "metadata-hash": b64(txn.metadata_hash),
+                "manager": txn.manager,
+                "reserve": txn.reserve,
+                "freeze": txn.freeze,
+                "clawback": txn.clawback,
+            }
+            params = {k: v for k, v in params.items() if v not in (None, "")}
+            self.assets[asset_id] = {
+                "index": asset_id, "params": params, "created-at-round": self.round, "deleted": False
+            }
+            self.acfg_txns.append({
+                "id": txid,
+                "tx-type": "acfg",
+                "sender": txn.sender,
+                "confirmed-round": self.round,
+                "created-asset-index": asset_id,
+                "note": b64(txn.note) or "",
+                "asset-config-transaction": {"asset-id": 0, "params": params},
+            })
+            info["asset-index"] = asset_id
+        elif txn.type == "acfg" and txn.index in self.assets:
+            # Reconfigure replaces the role addresses; none left means destroy
+            roles = {"manager": txn.manager, "reserve": txn.reserve, "freeze": txn.freeze, "clawback": txn.clawback}
+            roles = {k: v for k, v in roles.items() if v}
+            asset = self.assets[txn.index]
+            if roles:
+                asset["params"] = {**{k: v for k, v in asset["params"].items() if k not in ROLE_FIELDS}, **roles}
+            else:
+                asset["deleted"] = True
+            self.acfg_txns.append({
+                "id": txid,
+                "tx-type": "acfg",
+                "sender": txn.sender,
+                "confirmed-round": self.round,
+                "note": b64(txn.note) or "",
+                "asset-config-transaction": {"asset-id": txn.index, **({"params": roles} if roles else {})},
+            })
+        self.confirmed[txid] = info
+        record = {"txn": {"type": txn.type, "snd": txn.sender}}
+        if "asset-index" in info:
+            record["caid"] = info["asset-index"]
+        self.blocks[self.round].append((txid, record))
+
+    def submit(self, body: bytes) -> str:
+        # A group arrives as its signed transactions' msgpack encodings back to back
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(body)
+        stxns = [SignedTransaction.undictify(obj) for obj in unpacker]
+        if not stxns:
+            raise ValueError("empty transaction body")
+        with self.cond:
+            for stxn in stxns:
+                txid = stxn.get_txid()
+                if txid in self.confirmed:
+                    raise ValueError(f"transaction already in ledger: {txid}")
+                self.pending[txid] = (self.round, stxn)
+        return stxns[0].get_txid()
+
+    def status(self) -> dict:
+        return {"last-round": self.round, "time-since-last-round": 0, "catchup-time": 0}
+
+    def wait_for_block_after(self, round_num: int) -> dict:
+        with self.cond:
+            self.cond.wait_for(lambda: self.round > round_num, timeout=max(60, self.block_time * 2))
+            return self.status()
+
+
+class FakeNodeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; like algod, don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+    routes = []
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            # An API process exited with keep-alive connections still open
+            pass
+
+    def send_json(self, status: int, body: dict):
+        payload = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up, e.g. an API process stopped mid long-poll
+            self.close_connection = True
+
+    def dispatch(self, method: str):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        time.sleep(self.server.latency)
+        for route_method, pattern, handler in self.routes:
+            match = pattern.fullmatch(url.path)
+            if route_method == method and match:
+                try:
+                    status, response = handler(self.server.ledger, query, body, *match.groups())
+                except ValueError as e:
+                    status, response = 400, {"message": str(e)}
+                return self.send_json(status, response)
+        self.send_json(404, {"message": f"no route for {method} {url.path}"})
+
+    def do_GET(self):
+        self.dispatch("GET")
+
+    def do_POST(self):
+        self.dispatch("POST")
+
+
+def route(routes, method, path):
+    def register(handler):
+        routes.append((method, re.compile(path), handler))
+        return handler
+    return register
+
+
+class AlgodHandler(FakeNodeHandler):
+    routes = []
+
+
+class IndexerHandler(FakeNodeHandler):
+    routes = []
+
+
+# ------------------- algod -------------------
+@route(AlgodHandler.routes, "GET", r"/v2/transactions/params")
+def algod_params(ledger, query, body):
+    return 200, {
+        "consensus-version": "future", "fee": 0, "min-fee": 1000, "genesis-id": GENESIS_ID,
+        "genesis-hash": GENESIS_HASH, "last-round": ledger.round,
+    }
+
+
+@route(AlgodHandler.routes, "POST", r"/v2/transactions")
+def algod_send(ledger, query, body):
+    return 200, {"txId": ledger.submit(body)}
+
+
+@route(AlgodHandler.routes, "GET", r"/v2/status")
+def algod_status(ledger, query, body):
+    return 200, ledger.status()
+
+
+@route(AlgodHandler.routes, "GET", r"/v2/status/wait-for-block-after/(\d+)")
+def algod_wait(ledger, query, body, round_num):
+    return 200, ledger.wait_for_block_after(int(round_num))
+
+
+@route(AlgodHandler.routes, "GET", r"/v2/transactions/pending/(\w+)")
+def algod_pending(ledger, query, body, txid):
+    with ledger.cond:
+        if txid in ledger.confirmed:
+            return 200, ledger.confirmed[txid]
+        if txid in ledger.pending:
+            return 200, {"confirmed-round": 0, "pool-error": ""}
+    return 404, {"message": "txn does not exist"}
+
+
+@route(AlgodHandler.routes, "GET", r"/v2/blocks/(\d+)")
+def algod_block(ledger, query, body, round_num):
+    if int(round_num) not in ledger.blocks:
+        return 404, {"message": "ledger does not have entry"}
+    return 200, {"block": {"rnd": int(round_num), "txns": [record for _, record in ledger.blocks[int(round_num)]]}}
+
+
+@route(AlgodHandler.routes, "GET", r"/v2/blocks/(\d+)/txids")
+def algod_block_txids(ledger, query, body, round_num):
+    if int(round_num) not in ledger.blocks:
+        return 404, {"message": "ledger does not have entry"}
+    return 200, {"blockTxids": [txid for txid, _ in ledger.blocks[int(round_num)]]}
+
+
+@route(AlgodHandler.routes, "GET", r"/v2/assets/(\d+)")
+def algod_asset(ledger, query, body, asset_id):
+    asset = ledger.assets.get(int(asset_id))
+    if asset is None or asset["deleted"]:
+        return 404, {"message": "asset does not exist"}
+    return 200, {"index": asset["index"], "params": asset["params"]}
+
+
+# ------------------- indexer -------------------
+def page(items, query):
+    start = int(query.get("next") or 0)
+    limit = int(query.get("limit") or 1000)
+    chunk = items[start:start + limit]
+    response = {"next-token": str(start + limit)} if start + limit < len(items) else {}
+    return chunk, response
+
+
+@route(IndexerHandler.routes, "GET", r"/health")
+def indexer_health(ledger, query, body):
+    return 200, {"round": ledger.round, "db-available": True, "is-migrating": False, "version": "fake"}
+
+
+@route(IndexerHandler.routes, "GET", r"/v2/assets")
+def indexer_search_assets(ledger, query, body):
+    with ledger.cond:
+        assets = list(ledger.assets.values())
+    assets = [a for a in assets if not query.get("creator") or a["params"]["creator"] == query["creator"]]
+    chunk, response = page(assets, query)
+    return 200, {**response, "assets": chunk, "current-round": ledger.round}
+
+
+@route(IndexerHandler.routes, "GET", r"/v2/assets/(\d+)")
+def indexer_asset(ledger, query, body, asset_id):
+    asset = ledger.assets.get(int(asset_id))
+    if asset is None:
+        return 404, {"message": "no assets found for asset-id"}
+    return 200, {"asset": asset, "current-round": ledger.round}
+
+
+def filter_txns(ledger, query, asset_id=None):
+    min_round = int(query.get("min-round") or 0)
+    max_round = int(query.get("max-round") or 1 << 62)
+    return [
+        tx for tx in ledger.acfg_txns
+        if min_round <= tx["confirmed-round"] <= max_round
+        and (asset_id is None or asset_id in (tx.get("created-asset-index"),
+                                              tx["asset-config-transaction"]["asset-id"]))
+        and (not query.get("address") or tx["sender"] == query["address"])
+    ]
+
+
+@route(IndexerHandler.routes, "GET", r"/v2/transactions")
+def indexer_search_transactions(ledger, query, body):
+    chunk, response = page(filter_txns(ledger, query), query)
+    return 200, {**response, "transactions": chunk, "current-round": ledger.round}
+
+
+@route(IndexerHandler.routes, "GET", r"/v2/assets/(\d+)/transactions")
+def indexer_asset_transactions(ledger, query, body, asset_id):
+    chunk, response = page(filter_txns(ledger, query, int(asset_id)), query)
+    return 200, {**response, "transactions": chunk, "current-round": ledger.round}
+
+
+class FakeAlgorand:
+    """Ledger plus the algod and indexer servers, each on its own local port."""
+
+    def __init__(self, latency: float = 0.02, block_time: float = 1.0, host: str = "127.0.0.1",
+                 algod_port: int = 0, indexer_port: int = 0):
+        self.ledger = FakeLedger(block_time)
+        self.servers = []
+        for handler, port in ((AlgodHandler, algod_port), (IndexerHandler, indexer_port)):
+            server = ThreadingHTTPServer((host, port), handler)
+            server.daemon_threads = True
+            server.ledger = self.ledger
+            server.latency = latency
+            self.servers.append(server)
+
+    @property
+    def algod_url(self) -> str:
+        return "http://%s:%d" % self.servers[0].server_address
+
+    @property
+    def indexer_url(self) -> str:
+        return "http://%s:%d" % self.servers[1].server_address
+
+    def start(self):
+        self.ledger.start()
+        for server in self.servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.ledger.stop()
+        for server in self.servers:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every request")
+    parser.add_argument("--block-time", type=float, default=1.0, help="seconds between blocks")
+    parser.add_argument("--algod-port", type=int, default=4001)
+    parser.add_argument("--indexer-port", type=int, default=8980)
+    args = parser.parse_args()
+    node = FakeAlgorand(args.latency, args.block_time, algod_port=args.algod_port,
+                        indexer_port=args.indexer_port).start()
+    print(f"algod   {node.algod_url}\nindexer {node.indexer_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        node.stop()
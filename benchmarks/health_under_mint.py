@@ -0,0 +1,110 @@
+"""
+Measure /health latency while /mint requests are in flight.
+
+Each mint is followed through its /jobs status until the worker finishes.
+Algod and the indexer are the local stand-ins from benchmarks/fake_algorand.py
+(network round-trip per call, one block per confirmation), and email is
+disabled, so the run is fully offline. If any part of the mint path blocks
+the event loop, /health p99 climbs towards the block time.
+
+    python benchmarks/health_under_mint.py --mints 20 --probes 200
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from algosdk import account, mnemonic
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DEPLOYER", mnemonic.from_private_key(account.generate_account()[0]))
+os.environ["GMAIL_USER"] = ""
+os.environ["GMAIL_PASS"] = ""
+STATE_DIR = tempfile.mkdtemp(prefix="poap-bench-")
+os.environ["POAP_DB_PATH"] = os.path.join(STATE_DIR, "poap.db")
+os.environ["JOBS_FOLDER"] = os.path.join(STATE_DIR, "jobs")
+os.environ.setdefault("JOB_POLL_INTERVAL", "0.05")
+os.environ.setdefault("MINT_RATE_LIMIT", "0")
+
+import httpx  # noqa: E402
+
+from fake_algorand import FakeAlgorand  # noqa: E402
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(args):
+    node = FakeAlgorand(args.rtt, args.block_time).start()
+    os.environ["ALGOD_API_URL"] = node.algod_url
+    os.environ["INDEXER_API_URL"] = node.indexer_url
+    import main
+
+    logging.getLogger().setLevel(logging.ERROR)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def probe_health(samples):
+            for _ in range(args.probes):
+                start = time.perf_counter()
+                response = await client.get("/health")
+                response.raise_for_status()
+                samples.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(args.interval)
+
+        async def mint(i):
+            files = {"certificate_file": (f"cert_{i}.txt", f"certificate {i}".encode(), "text/plain")}
+            data = {
+                "event": "Bench Event",
+                "organizer": "Bench",
+                "date": "2024-01-01",
+                "recipient_name": f"Recipient {i}",
+                "recipient_email": f"r{i}@example.com",
+            }
+            response = await client.post("/mint", data=data, files=files)
+            response.raise_for_status()
+            status_url = response.json()["status_url"]
+            while True:
+                job = (await client.get(status_url)).json()
+                if job["status"] in ("succeeded", "failed"):
+                    return job
+                await asyncio.sleep(0.05)
+
+        idle = []
+        await probe_health(idle)
+
+        loaded = []
+        start = time.perf_counter()
+        _, *jobs = await asyncio.gather(probe_health(loaded), *(mint(i) for i in range(args.mints)))
+        elapsed = time.perf_counter() - start
+    node.stop()
+
+    failed = [job for job in jobs if job["status"] != "succeeded"]
+    if failed:
+        print(f"{len(failed)} mint jobs failed, first error: {failed[0]['error']}")
+
+    print(f"{args.mints} concurrent mints finished in {elapsed:.2f}s (MINT_WORKERS={main.MINT_WORKERS})")
+    for label, samples in (("idle", idle), ("during mints", loaded)):
+        print(
+            f"/health {label:>13}: p50={statistics.median(samples):.2f}ms "
+            f"p99={percentile(samples, 99):.2f}ms max={max(samples):.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mints", type=int, default=20, help="concurrent /mint requests")
+    parser.add_argument("--probes", type=int, default=200, help="/health requests per phase")
+    parser.add_argument("--interval", type=float, default=0.01, help="seconds between /health probes")
+    parser.add_argument("--rtt", type=float, default=0.05, help="simulated algod/indexer round-trip (s)")
+    parser.add_argument("--block-time", type=float, default=1.0, help="simulated block time (s)")
+    asyncio.run(run(parser.parse_args()))
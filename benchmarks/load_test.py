@@ -0,0 +1,243 @@
+"""
+Offline load test for the API: throughput and latency percentiles per endpoint.
+
+Starts a fake algod/indexer (benchmarks/fake_algorand.py) and an SMTP sink
+(benchmarks/smtp_sink.py), runs the API under uvicorn against them with
+fresh local state, and drives each scenario at the given concurrency:
+
+    mint          POST /mint, then follows every job to completion
+    verify        POST /verify for minted assets
+    verify-many   POST /verify-multiple with --batch assets per request
+    certificate   POST /get-certificate for minted assets
+    hash-lookup   POST /verify-file with the minted certificate files
+
+Nothing leaves the machine. Use --json to save results and compare runs.
+
+    python benchmarks/load_test.py --requests 200 --concurrency 20 --block-time 1
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+from algosdk import account, mnemonic
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_algorand import FakeAlgorand  # noqa: E402
+from smtp_sink import SMTPSink  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+SCENARIOS = ("mint", "verify", "verify-many", "certificate", "hash-lookup")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(name, latencies, errors, elapsed, extra=None):
+    result = {
+        "scenario": name,
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+    }
+    if latencies:
+        ms = [value * 1000 for value in latencies]
+        result.update({
+            "p50_ms": round(statistics.median(ms), 2),
+            "p90_ms": round(percentile(ms, 90), 2),
+            "p99_ms": round(percentile(ms, 99), 2),
+            "max_ms": round(max(ms), 2),
+        })
+    result.update(extra or {})
+    return result
+
+
+async def drive(count, concurrency, request):
+    """Run `request(i)` count times with at most `concurrency` in flight."""
+    latencies, errors = [], 0
+    queue = iter(range(count))
+
+    async def worker():
+        nonlocal errors
+        for i in queue:
+            start = time.perf_counter()
+            try:
+                await request(i)
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def certificate_body(i: int) -> bytes:
+    return f"benchmark certificate {i}\n".encode() * 64
+
+
+async def run_scenarios(client, args):
+    results, minted = [], []
+
+    if "mint" in args.scenarios:
+        job_urls = {}
+
+        async def mint(i):
+            response = await client.post("/mint", data={
+                "event": "Load Test", "organizer": "Bench", "date": "2024-01-01",
+                "recipient_name": f"Recipient {i}", "recipient_email": f"r{i}@example.com",
+            }, files={"certificate_file": (f"cert_{i}.txt", certificate_body(i), "text/plain")})
+            response.raise_for_status()
+            job_urls[i] = (response.json()["status_url"], time.perf_counter())
+
+        latencies, errors, elapsed = await drive(args.requests, args.concurrency, mint)
+        results.append(summarize("mint (accept)", latencies, errors, elapsed))
+
+        completions, failed = [], 0
+        start = time.perf_counter()
+        for i, (status_url, accepted_at) in job_urls.items():
+            while True:
+                job = (await client.get(status_url)).json()
+                if job["status"] not in ("queued", "running"):
+                    break
+                await asyncio.sleep(0.1)
+            if job["status"] == "succeeded":
+                completions.append(time.perf_counter() - accepted_at)
+                minted.append((i, job["result"]["asset_id"]))
+            else:
+                failed += 1
+        results.append(summarize("mint (end to end)", completions, failed,
+                                 elapsed + time.perf_counter() - start))
+
+    asset_ids = [asset_id for _, asset_id in minted]
+    if not asset_ids:
+        return results
+
+    if "verify" in args.scenarios:
+        async def verify(i):
+            (await client.post("/verify", json={"asset_id": asset_ids[i % len(asset_ids)]})).raise_for_status()
+        results.append(summarize("verify", *await drive(args.requests, args.concurrency, verify)))
+
+    if "verify-many" in args.scenarios:
+        async def verify_many(i):
+            batch = [asset_ids[(i * args.batch + k) % len(asset_ids)] for k in range(args.batch)]
+            (await client.post("/verify-multiple", json=batch)).raise_for_status()
+        latencies, errors, elapsed = await drive(max(1, args.requests // args.batch), args.concurrency, verify_many)
+        results.append(summarize("verify-multiple", latencies, errors, elapsed, {"batch": args.batch}))
+
+    if "certificate" in args.scenarios:
+        async def certificate(i):
+            (await client.post("/get-certificate", json={"asset_id": asset_ids[i % len(asset_ids)]})).raise_for_status()
+        results.append(summarize("get-certificate", *await drive(args.requests, args.concurrency, certificate)))
+
+    if "hash-lookup" in args.scenarios:
+        async def hash_lookup(i):
+            index, _ = minted[i % len(minted)]
+            files = {"certificate_file": (f"cert_{index}.txt", certificate_body(index), "text/plain")}
+            (await client.post("/verify-file", files=files)).raise_for_status()
+        results.append(summarize("verify-file", *await drive(args.requests, args.concurrency, hash_lookup)))
+
+    return results
+
+
+def print_table(results):
+    header = f"{'scenario':<20} {'reqs':>6} {'errs':>5} {'req/s':>8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['scenario']:<20} {r['requests']:>6} {r['errors']:>5} {r['throughput_rps']:>8.1f} "
+            f"{r.get('p50_ms', 0):>9.1f} {r.get('p90_ms', 0):>9.1f} {r.get('p99_ms', 0):>9.1f} {r.get('max_ms', 0):>9.1f}"
+        )
+
+
+async def run(args):
+    node = FakeAlgorand(args.latency, args.block_time).start()
+    sink = SMTPSink().start()
+    state_dir = tempfile.mkdtemp(prefix="poap-load-")
+    port = free_port()
+    env = {
+        **os.environ,
+        "DEPLOYER": mnemonic.from_private_key(account.generate_account()[0]),
+        "ALGOD_API_URL": node.algod_url,
+        "INDEXER_API_URL": node.indexer_url,
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(sink.port),
+        "SMTP_STARTTLS": "0",
+        "GMAIL_USER": "bench@example.com",
+        "GMAIL_PASS": "",
+        "POAP_DB_PATH": os.path.join(state_dir, "poap.db"),
+        "JOBS_FOLDER": os.path.join(state_dir, "jobs"),
+        "JOB_POLL_INTERVAL": "0.05",
+        "OUTBOX_POLL_INTERVAL": "0.2",
+        # Every simulated client shares one IP; measure the service, not its rate limits
+        "MINT_RATE_LIMIT": "0",
+        "READ_RATE_LIMIT": "0",
+    }
+    server_log_path = os.path.join(state_dir, "server.log")
+    server_log = open(server_log_path, "w")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers)],
+        cwd=ROOT, env=env, stdout=server_log, stderr=subprocess.STDOUT
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=120, limits=limits) as client:
+            for _ in range(300):
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("API did not become healthy")
+            results = await run_scenarios(client, args)
+            # Give the outbox a moment to drain before reading the sink
+            await asyncio.sleep(1)
+    finally:
+        server.terminate()
+        server.wait()
+        server_log.close()
+        node.stop()
+        sink.shutdown()
+
+    print(f"latency={args.latency * 1000:.0f}ms block_time={args.block_time}s "
+          f"concurrency={args.concurrency} workers={args.workers}")
+    print_table(results)
+    print(f"emails delivered to sink: {sink.stats['messages']} over {sink.stats['connections']} connections")
+    print(f"server log: {server_log_path}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results, "smtp": sink.stats}, f, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="requests in flight per scenario")
+    parser.add_argument("--batch", type=int, default=20, help="asset IDs per /verify-multiple request")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated algod/indexer latency (s)")
+    parser.add_argument("--block-time", type=float, default=1.0, help="simulated block time (s)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--json", help="also write results to this file")
+    asyncio.run(run(parser.parse_args()))
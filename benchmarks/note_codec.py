@@ -0,0 +1,74 @@
+"""
+On-chain note size and decode throughput: legacy JSON notes vs. version 2
+msgpack notes (notes.py), for a typical certificate and one with long names.
+
+Decoding goes through the same entry point the API uses for every
+verification, so legacy notes are measured as the decoder sees them today.
+
+    python benchmarks/note_codec.py --count 200000
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from notes import MAX_NOTE_BYTES, decode_note, encode_note  # noqa: E402
+
+TYPICAL = {
+    "event": "Algorand Builders Summit",
+    "organizer": "BishwasChain",
+    "date": "2024-01-01",
+    "recipient_name": "Ada Lovelace",
+    "recipient_email": "ada.lovelace@example.com",
+    "certificate_hash": hashlib.sha256(b"certificate").hexdigest(),
+    "poap_version": "1.0",
+    "type": "application/pdf",
+}
+LONG = {
+    **TYPICAL,
+    "event": "International Conference on Decentralized Systems, Cryptography and Applied Consensus " * 6,
+    "organizer": "Faculty of Computer Science and Engineering, Department of Distributed Systems " * 3,
+    "recipient_name": "Maximiliana Alexandrina Konstantinopoulou-Vanderbilt",
+}
+
+
+def legacy_note(note_data: dict) -> bytes:
+    """A note as mint_nft wrote it before version 2."""
+    return json.dumps(note_data).encode("utf-8")
+
+
+def decode_rate(note: bytes, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        decode_note(note)
+    return count / (time.perf_counter() - start)
+
+
+def run(args):
+    print(f"{'note':<10} {'format':<8} {'bytes':>6} {'fits':>5} {'decodes/s':>12}")
+    for label, note_data in (("typical", TYPICAL), ("long", LONG)):
+        legacy = legacy_note(note_data)
+        try:
+            compact = encode_note(note_data)
+        except ValueError:
+            compact = None
+        assert decode_note(legacy) == note_data
+        if compact is not None:
+            expected = {k: v for k, v in note_data.items() if k != "certificate_hash"}
+            assert decode_note(compact) == {**expected, "poap_version": "2.0"}
+        for fmt, note in (("json", legacy), ("v2", compact)):
+            if note is None:
+                print(f"{label:<10} {fmt:<8} {'-':>6} {'no':>5} {'-':>12}")
+                continue
+            fits = "yes" if len(note) <= MAX_NOTE_BYTES else "no"
+            print(f"{label:<10} {fmt:<8} {len(note):>6} {fits:>5} {decode_rate(note, args.count):>12,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000, help="decodes per note")
+    run(parser.parse_args())
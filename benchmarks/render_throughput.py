@@ -0,0 +1,64 @@
+"""
+Certificate PDFs per second for single and batch rendering.
+
+Reports the one-off template build, then steady-state throughput with cold
+QR codes (a new asset per render, as in a fresh batch) and warm QR codes
+(re-rendering assets already in the QR cache).
+
+    python benchmarks/render_throughput.py --count 500
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import rendering  # noqa: E402
+
+DETAILS = {
+    "event": "Algorand Builders Summit",
+    "organizer": "BishwasChain",
+    "date": "2024-01-01",
+    "recipient_name": "Ada Lovelace",
+}
+
+
+def report(label, count, elapsed):
+    print(f"{label:<28} {count / elapsed:8.1f} PDFs/s  ({elapsed / count * 1000:.2f} ms/PDF)")
+
+
+def run(args):
+    start = time.perf_counter()
+    rendering.get_certificate_template()
+    print(f"{'template build':<28} {(time.perf_counter() - start) * 1000:8.1f} ms (once per process)")
+
+    first_id = 10_000_000
+    ids = range(first_id, first_id + args.count)
+
+    start = time.perf_counter()
+    for asset_id in ids:
+        rendering.render_certificate_pdf(asset_id, DETAILS)
+    report("single, cold QR", args.count, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for asset_id in ids:
+        rendering.render_certificate_pdf(asset_id, DETAILS)
+    report("single, warm QR", args.count, time.perf_counter() - start)
+
+    batch_ids = range(first_id + args.count, first_id + 2 * args.count)
+    items = [(asset_id, DETAILS) for asset_id in batch_ids]
+    start = time.perf_counter()
+    for i in range(0, len(items), args.batch_size):
+        rendering.render_certificate_pdfs(items[i:i + args.batch_size])
+    report(f"batch of {args.batch_size}, cold QR", args.count, time.perf_counter() - start)
+
+    info = rendering.qr_runs.cache_info()
+    print(f"QR cache: {info.hits} hits, {info.misses} misses, {info.currsize}/{info.maxsize} entries")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=500, help="PDFs per phase")
+    parser.add_argument("--batch-size", type=int, default=50, help="certificates per batch call")
+    run(parser.parse_args())
@@ -0,0 +1,80 @@
+"""
+Minimal SMTP sink: accepts every message over plain SMTP (no STARTTLS) and
+counts it. Point the API at it with SMTP_HOST/SMTP_PORT and SMTP_STARTTLS=0.
+
+    python benchmarks/smtp_sink.py --port 2525
+"""
+import argparse
+import socketserver
+import threading
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.record(connections=1)
+        self.reply("220 smtp-sink ready")
+        in_data, size = False, 0
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line == b".\r\n":
+                    in_data = False
+                    self.server.record(messages=1, bytes=size)
+                    self.reply("250 2.0.0 queued")
+                else:
+                    size += len(line)
+                continue
+            command = line.split(b" ", 1)[0].strip().upper()
+            if command in (b"EHLO", b"HELO"):
+                self.reply("250-smtp-sink")
+                self.reply("250 AUTH PLAIN LOGIN")
+            elif command == b"AUTH":
+                self.reply("235 2.7.0 accepted")
+            elif command == b"DATA":
+                in_data, size = True, 0
+                self.reply("354 end with <CRLF>.<CRLF>")
+            elif command == b"QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), SMTPSinkHandler)
+        self.stats = {"connections": 0, "messages": 0, "bytes": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def record(self, **counts):
+        with self._lock:
+            for key, value in counts.items():
+                self.stats[key] += value
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=2525)
+    args = parser.parse_args()
+    sink = SMTPSink(port=args.port)
+    print(f"SMTP sink listening on 127.0.0.1:{sink.port}")
+    try:
+        sink.serve_forever()
+    except KeyboardInterrupt:
+        print(sink.stats)
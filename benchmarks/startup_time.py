@@ -0,0 +1,125 @@
+"""
+Cold-start cost of an API worker: import time, process start to first
+successful request, and the first vs. second /verify latency.
+
+Runs against the local fake algod/indexer, once with a DEPLOYER mnemonic
+(full mode) and once with only DEPLOYER_ADDRESS (verify-only), with fresh
+state each time.
+
+    python benchmarks/startup_time.py --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+from algosdk import account, mnemonic, transaction
+from algosdk.v2client.algod import AlgodClient
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_algorand import FakeAlgorand  # noqa: E402
+from load_test import free_port  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def seed_asset(node: FakeAlgorand, private_key: str) -> int:
+    """Mint one POAP-shaped asset on the fake ledger to verify against."""
+    algod = AlgodClient("", node.algod_url)
+    address = account.address_from_private_key(private_key)
+    txn = transaction.AssetConfigTxn(
+        sender=address, sp=algod.suggested_params(), total=1, default_frozen=False, unit_name="POAP",
+        asset_name="POAP: Startup", manager=address, reserve=address, freeze=address, clawback=address,
+        url="https://example.com", metadata_hash=bytes(32), note=b'{"event": "Startup"}'
+    )
+    txid = algod.send_transaction(txn.sign(private_key))
+    return transaction.wait_for_confirmation(algod, txid, 10)["asset-index"]
+
+
+def mode_env(node: FakeAlgorand, private_key: str, verify_only: bool) -> dict:
+    state_dir = tempfile.mkdtemp(prefix="poap-startup-")
+    env = {
+        **os.environ,
+        "ALGOD_API_URL": node.algod_url,
+        "INDEXER_API_URL": node.indexer_url,
+        "POAP_DB_PATH": os.path.join(state_dir, "poap.db"),
+        "JOBS_FOLDER": os.path.join(state_dir, "jobs"),
+        "GMAIL_USER": "",
+        "DEPLOYER_ADDRESS": account.address_from_private_key(private_key),
+    }
+    env.pop("DEPLOYER", None)
+    if not verify_only:
+        env["DEPLOYER"] = mnemonic.from_private_key(private_key)
+    return env
+
+
+def measure_import(env: dict) -> float:
+    output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def measure_first_requests(env: dict, asset_id: int) -> tuple:
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            while True:
+                try:
+                    if client.get("/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.005)
+            ready = time.perf_counter() - start
+            verify_latencies = []
+            for _ in range(2):
+                t = time.perf_counter()
+                client.post("/verify", json={"asset_id": asset_id}).raise_for_status()
+                verify_latencies.append(time.perf_counter() - t)
+    finally:
+        server.terminate()
+        server.wait()
+    return ready, verify_latencies[0], verify_latencies[1]
+
+
+def run(args):
+    node = FakeAlgorand(args.latency, args.block_time).start()
+    private_key = account.generate_account()[0]
+    asset_id = seed_asset(node, private_key)
+
+    print(f"upstream latency={args.latency * 1000:.0f}ms, median of {args.runs} runs")
+    print(f"{'mode':<12} {'import ms':>10} {'ready ms':>10} {'1st verify ms':>14} {'2nd verify ms':>14}")
+    for verify_only in (False, True):
+        imports, ready, first, second = [], [], [], []
+        for _ in range(args.runs):
+            env = mode_env(node, private_key, verify_only)
+            imports.append(measure_import(env))
+            r, f, s = measure_first_requests(env, asset_id)
+            ready.append(r)
+            first.append(f)
+            second.append(s)
+        print(
+            f"{'verify-only' if verify_only else 'full':<12} {statistics.median(imports) * 1000:>10.0f} "
+            f"{statistics.median(ready) * 1000:>10.0f} {statistics.median(first) * 1000:>14.1f} "
+            f"{statistics.median(second) * 1000:>14.1f}"
+        )
+    node.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="cold starts per mode")
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated algod/indexer latency (s)")
+    parser.add_argument("--block-time", type=float, default=0.2, help="simulated block time (s)")
+    run(parser.parse_args())
@@ -1,33 +1,49 @@
 import os
 import json
+import asyncio
+import contextvars
+import functools
 import base64
 import binascii
 import hashlib
-import smtplib
+import io
+import csv
+import zipfile
+import random
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.application import MIMEApplication
-from email.mime.image import MIMEImage
-from email.header import Header
-from typing import List
+import socket
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import argparse
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import List, Optional, Union
 from mimetypes import guess_type
+from concurrent.futures import ThreadPoolExecutor
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, File, UploadFile, Form
+from fastapi import FastAPI, HTTPException, File, UploadFile, Form, Header, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
 from algosdk.v2client.algod import AlgodClient
-from algosdk.v2client.indexer import IndexerClient
-from algosdk import account, mnemonic
-from algosdk.transaction import AssetConfigTxn, wait_for_confirmation
-from algosdk.error import AlgodHTTPError
+from algosdk import account, encoding, mnemonic
+from algosdk.transaction import AssetConfigTxn, assign_group_id
+from algosdk.error import AlgodHTTPError, ConfirmationTimeoutError, TransactionRejectedError
 from fastapi.responses import FileResponse
 from fastapi import HTTPException
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import cm
-import qrcode
+from render_pool import RenderPool
+from admission import BodySizeLimit, RateLimit, RateLimiter
+from notes import NOTE_VERSION, NoteTooLargeError, encode_note, decode_note as decode_note_bytes
+from metrics import REGISTRY, Gauge, Histogram, TimedClient, request_timings, server_timing_header, stage_timer
+from upstream import (
+    CircuitBreaker, PooledAlgodClient, PooledIndexerClient, UpstreamTransport, UpstreamUnavailableError
+)
 from fastapi.middleware.cors import CORSMiddleware
 
 # Configure logging
@@ -46,34 +62,446 @@ load_dotenv()
 GMAIL_USER = os.getenv("GMAIL_USER")
 GMAIL_PASS = os.getenv("GMAIL_PASS")
 
-# Algorand
+# SMTP delivery (override the host to test against a local stand-in server)
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") == "1"
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "2"))
+# Idle connections older than this are probed with NOOP before reuse
+SMTP_IDLE_CHECK = float(os.getenv("SMTP_IDLE_CHECK", "60"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "2.0"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "20"))
+
+# Algorand. Without the DEPLOYER mnemonic the API runs verify-only against DEPLOYER_ADDRESS.
 DEPLOYER_MNEMONIC = os.getenv("DEPLOYER")
+DEPLOYER_ADDRESS = os.getenv("DEPLOYER_ADDRESS", "")
 ALGOD_API_KEY = os.getenv("ALGOD_API_KEY", "")
 ALGOD_API_URL = os.getenv("ALGOD_API_URL", "https://testnet-api.algonode.cloud")
 INDEXER_API_URL = os.getenv("INDEXER_API_URL", "https://testnet-idx.algonode.cloud")
-
-TEMP_FOLDER = "./temp"
-os.makedirs(TEMP_FOLDER, exist_ok=True)
-
-if not DEPLOYER_MNEMONIC:
-    raise Exception("DEPLOYER mnemonic not found in environment variables")
+# Comma-separated failover lists; the first healthy endpoint is used
+ALGOD_API_URLS = [url.strip() for url in os.getenv("ALGOD_API_URLS", ALGOD_API_URL).split(",") if url.strip()]
+INDEXER_API_URLS = [url.strip() for url in os.getenv("INDEXER_API_URLS", INDEXER_API_URL).split(",") if url.strip()]
+
+# Threads reserved for blocking algod/indexer/SMTP calls made from async routes
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", "16"))
+
+# Upstream transport: deadline per call (retries included), retries for reads,
+# and how long a failed endpoint is skipped
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "10"))
+UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", "2"))
+UPSTREAM_BACKOFF = float(os.getenv("UPSTREAM_BACKOFF", "0.1"))
+UPSTREAM_ENDPOINT_COOLDOWN = float(os.getenv("UPSTREAM_ENDPOINT_COOLDOWN", "30"))
+# Circuit breaker: consecutive failed calls before failing fast, and for how long
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "15"))
+# Calls in flight per upstream, and how long a call may wait for a slot
+ALGOD_MAX_CONCURRENCY = int(os.getenv("ALGOD_MAX_CONCURRENCY", "8"))
+INDEXER_MAX_CONCURRENCY = int(os.getenv("INDEXER_MAX_CONCURRENCY", "8"))
+UPSTREAM_QUEUE_TIMEOUT = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT", "2"))
+
+# Admission control. Clients are told apart by a known X-API-Key (one of
+# API_KEYS) or else by IP. Rates are per client per process, in mints or
+# verified assets per second; 0 turns a limit off.
+API_KEYS = {key.strip() for key in os.getenv("API_KEYS", "").split(",") if key.strip()}
+MINT_RATE_LIMIT = float(os.getenv("MINT_RATE_LIMIT", "0.5"))
+MINT_RATE_BURST = float(os.getenv("MINT_RATE_BURST", "10"))
+READ_RATE_LIMIT = float(os.getenv("READ_RATE_LIMIT", "20"))
+READ_RATE_BURST = float(os.getenv("READ_RATE_BURST", "100"))
+VERIFY_MAX_BATCH = int(os.getenv("VERIFY_MAX_BATCH", "100"))
+MINT_BATCH_MAX_ROWS = int(os.getenv("MINT_BATCH_MAX_ROWS", "1000"))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+MAX_BATCH_UPLOAD_BYTES = int(os.getenv("MAX_BATCH_UPLOAD_BYTES", str(500 * 1024 * 1024)))
+
+# Worker processes for QR/PDF rendering, render jobs per batch, and batches allowed in flight
+RENDER_PROCESSES = int(os.getenv("RENDER_PROCESSES", str(max(1, (os.cpu_count() or 2) - 1))))
+RENDER_BATCH_SIZE = int(os.getenv("RENDER_BATCH_SIZE", "25"))
+RENDER_MAX_PENDING = int(os.getenv("RENDER_MAX_PENDING", str(2 * RENDER_PROCESSES)))
+
+# Local state: SQLite database shared by every worker process on this host
+POAP_DB_PATH = os.getenv("POAP_DB_PATH", "./poap.db")
+
+# Mint job queue
+JOBS_FOLDER = os.getenv("JOBS_FOLDER", "./jobs")
+MINT_WORKERS = int(os.getenv("MINT_WORKERS", "2"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+# Jobs each worker keeps submitted and awaiting confirmation at once
+MINT_PIPELINE_DEPTH = int(os.getenv("MINT_PIPELINE_DEPTH", "8"))
+# Repeated /mint requests for the same file are deduplicated per "recipient"
+# (file hash + recipient email) or per "file" (file hash alone)
+MINT_IDEMPOTENCY_SCOPE = os.getenv("MINT_IDEMPOTENCY_SCOPE", "recipient")
+
+# Deployer transaction pipeline: suggested params are refetched once a new
+# round is seen, or after this many seconds when nothing is tracking rounds
+SUGGESTED_PARAMS_MAX_AGE = float(os.getenv("SUGGESTED_PARAMS_MAX_AGE", "3.0"))
+CONFIRMATION_WAIT_ROUNDS = int(os.getenv("CONFIRMATION_WAIT_ROUNDS", "1000"))
+
+# Batch minting (Algorand caps atomic groups at 16 transactions)
+MAX_GROUP_SIZE = 16
+# Algorand rejects asset names longer than this many bytes
+MAX_ASSET_NAME_BYTES = 32
+
+# Certificate registry: local view of every deployer asset (params, note, metadata
+# hash), kept in step with the chain. With REGISTRY_FOLLOW_BLOCKS it syncs after
+# every new algod round; otherwise, or while algod is unreachable, it polls.
+REGISTRY_FOLLOW_BLOCKS = os.getenv("REGISTRY_FOLLOW_BLOCKS", "1") == "1"
+REGISTRY_SYNC_INTERVAL = float(os.getenv("REGISTRY_SYNC_INTERVAL", "60"))
+REGISTRY_MISS_SYNC_INTERVAL = float(os.getenv("REGISTRY_MISS_SYNC_INTERVAL", "5"))
+INDEXER_PAGE_SIZE = int(os.getenv("INDEXER_PAGE_SIZE", "1000"))
+
+# In-process caches for on-chain asset data. Creation params and notes never
+# change after mint; manager/reserve/freeze/clawback can, so they expire quickly.
+ASSET_CACHE_SIZE = int(os.getenv("ASSET_CACHE_SIZE", "10000"))
+IMMUTABLE_CACHE_TTL = float(os.getenv("IMMUTABLE_CACHE_TTL", "86400"))
+MUTABLE_CACHE_TTL = float(os.getenv("MUTABLE_CACHE_TTL", "30"))
+# Set to "sqlite" to share cache entries between uvicorn workers through POAP_DB_PATH
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "")
+
+# HTTP caching of the GET verification routes. Responses include the mutable
+# role addresses and whether the asset was destroyed, so caches keep them only
+# briefly and then revalidate with the ETag, which costs a 304.
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "30"))
+# Directory for a static JSON page per minted certificate, <certificate_hash>.json,
+# for a web server or CDN to serve at /poap/{certificate_hash}. Unset to disable.
+POAP_STATIC_DIR = os.getenv("POAP_STATIC_DIR", "")
+
+# Certificate export: indexer note lookups run concurrently for assets missing from the registry
+EXPORT_NOTE_CONCURRENCY = int(os.getenv("EXPORT_NOTE_CONCURRENCY", "8"))
+
+# Batch verification fan-out
+VERIFY_CONCURRENCY = int(os.getenv("VERIFY_CONCURRENCY", "8"))
+VERIFY_MAX_CONCURRENCY = int(os.getenv("VERIFY_MAX_CONCURRENCY", "32"))
+
+# Startup warm-up: upstream connections, suggested params and render workers
+# are ready before the first request, within this many seconds
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "10"))
+
+# Add a Server-Timing header with per-stage upstream durations to every response
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+
+# Uploads are hashed in fixed-size chunks so memory stays flat regardless of file size
+HASH_CHUNK_SIZE = int(os.getenv("HASH_CHUNK_SIZE", str(1024 * 1024)))
+os.makedirs(JOBS_FOLDER, exist_ok=True)
+if POAP_STATIC_DIR:
+    os.makedirs(POAP_STATIC_DIR, exist_ok=True)
+
+if not DEPLOYER_MNEMONIC and not DEPLOYER_ADDRESS:
+    raise Exception("Set DEPLOYER (mnemonic) to mint, or DEPLOYER_ADDRESS to run verify-only")
 
 # Initialize Algorand clients
 headers = {"X-API-Key": ALGOD_API_KEY} if ALGOD_API_KEY else {}
-algod_client = AlgodClient(ALGOD_API_KEY, ALGOD_API_URL, headers)
-indexer_client = IndexerClient(ALGOD_API_KEY, INDEXER_API_URL, headers)
+
+def upstream_transport(name: str, urls: List[str], max_concurrency: int) -> UpstreamTransport:
+    breaker = CircuitBreaker(name, BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+    # One idle keep-alive connection per blocking thread is enough to never reconnect
+    return UpstreamTransport(name, urls, UPSTREAM_TIMEOUT, UPSTREAM_RETRIES, UPSTREAM_BACKOFF,
+                             UPSTREAM_ENDPOINT_COOLDOWN, BLOCKING_WORKERS, breaker,
+                             max_concurrency, UPSTREAM_QUEUE_TIMEOUT)
+
+algod_transport = upstream_transport("algod", ALGOD_API_URLS, ALGOD_MAX_CONCURRENCY)
+indexer_transport = upstream_transport("indexer", INDEXER_API_URLS, INDEXER_MAX_CONCURRENCY)
+# Every call is timed into the "algod"/"indexer" stage metrics
+algod_client = TimedClient(PooledAlgodClient(ALGOD_API_KEY, algod_transport, headers), "algod")
+indexer_client = TimedClient(PooledIndexerClient(ALGOD_API_KEY, indexer_transport, headers), "indexer")
 
 # Deployer account
-deployer_private_key = mnemonic.to_private_key(DEPLOYER_MNEMONIC)
-deployer_address = account.address_from_private_key(deployer_private_key)
+if DEPLOYER_MNEMONIC:
+    deployer_private_key = mnemonic.to_private_key(DEPLOYER_MNEMONIC)
+    deployer_address = account.address_from_private_key(deployer_private_key)
+else:
+    deployer_private_key = None
+    deployer_address = DEPLOYER_ADDRESS
+    logging.warning("DEPLOYER mnemonic not set; running verify-only, minting is disabled")
+VERIFY_ONLY = deployer_private_key is None
+
+# ------------------- Async Algorand Layer -------------------
+# Dedicated pool so slow algod rounds and SMTP handshakes never eat into the
+# threadpool FastAPI uses for the sync routes (/verify, /get-certificate).
+blocking_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking")
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run a blocking callable on the blocking executor without stalling the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    # Carry the caller's context so stage timings land on the right request
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(blocking_executor, context.run, functools.partial(func, *args, **kwargs))
+
+class AsyncAlgodClient:
+    """
+    Awaitable facade over AlgodClient. Every method call is dispatched to the
+    blocking executor, so `await async_algod.suggested_params()` is safe inside async routes.
+    """
+    def __init__(self, client: AlgodClient):
+        self.client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await run_blocking(attr, *args, **kwargs)
+        return call
+
+async_algod = AsyncAlgodClient(algod_client)
+
+render_pool = RenderPool(RENDER_PROCESSES, RENDER_MAX_PENDING, RENDER_BATCH_SIZE)
+
+# ------------------- Deployer Transaction Pipeline -------------------
+class SuggestedParamsCache:
+    """
+    Suggested params shared by every deployer transaction.
+
+    Params stay valid for 1000 rounds, so one fetch per round is plenty. The
+    confirmation tracker reports each round it sees; when it is idle the
+    cached params simply expire after SUGGESTED_PARAMS_MAX_AGE seconds.
+    Concurrent callers share a single in-flight fetch.
+    """
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._params = None
+        self._fetched_at = 0.0
+        self._latest_round = 0
+        self._lock = None
+
+    def observe_round(self, round_num: int):
+        self._latest_round = max(self._latest_round, round_num)
+
+    def _fresh(self) -> bool:
+        return (
+            self._params is not None
+            and self._params.first >= self._latest_round
+            and time.monotonic() - self._fetched_at < self.max_age
+        )
+
+    async def get(self):
+        if self._fresh():
+            return self._params
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._fresh():
+                params = await async_algod.suggested_params()
+                self._params, self._fetched_at = params, time.monotonic()
+                self.observe_round(params.first)
+            return self._params
+
+class ConfirmationTracker:
+    """
+    Single confirmation loop for every deployer transaction in this process.
+
+    Rather than one polling loop per request, callers register atomic groups
+    (a single transaction is a group of one) and await a shared future. One
+    task waits on `status_after_block` and, after each new round, checks the
+    first transaction of every pending group: a group confirms or fails as a
+    whole, so one `pending_transaction_info` per group is enough. The rest of
+    a confirmed group's info is read from its block, once per round. The
+    loop runs only while something is waiting.
+    """
+    def __init__(self, wait_rounds: int):
+        self.wait_rounds = wait_rounds
+        self._pending = {}  # first txid -> (future, group txids, last round to wait for)
+        self._task = None
+        self._last_round = None
+
+    async def wait(self, txid: str) -> dict:
+        """Return the transaction's confirmed pending-info once it is in a block."""
+        return (await self.wait_group([txid]))[0]
+
+    async def wait_group(self, txids: List[str]) -> List[dict]:
+        """Confirmation info for each transaction of a submitted atomic group, in group order."""
+        if self._task is None or self._task.done():
+            # Idle tracker: start counting rounds from the chain's current tip
+            last_round = (await async_algod.status())["last-round"]
+            self._last_round = max(self._last_round or 0, last_round)
+            if self._task is None or self._task.done():
+                self._task = asyncio.create_task(self._run())
+        key = txids[0]
+        if key not in self._pending:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = (future, list(txids), self._last_round + self.wait_rounds)
+        # Shielded so one cancelled caller does not cancel the shared future
+        return await asyncio.shield(self._pending[key][0])
+
+    def pending_count(self) -> int:
+        return sum(len(txids) for _, txids, _ in self._pending.values())
+
+    async def _read_round(self, round_num: int) -> dict:
+        """Confirmation info for every transaction in a block, by txid, shaped like pending-info."""
+        block, txids = await asyncio.gather(
+            async_algod.block_info(round_num), async_algod.get_block_txids(round_num)
+        )
+        confirmed = {}
+        # The block's payset and its txid list are in the same order
+        for txid, stxn in zip(txids.get("blockTxids") or [], block["block"].get("txns") or []):
+            info = {"confirmed-round": round_num, "pool-error": ""}
+            if stxn.get("caid"):
+                info["asset-index"] = stxn["caid"]
+            confirmed[txid] = info
+        return confirmed
+
+    async def _check(self, key: str, rounds: dict):
+        future, txids, deadline = self._pending[key]
+        try:
+            tx_info = await async_algod.pending_transaction_info(key)
+        except AlgodHTTPError:
+            # Load-balanced algod may not know the txid yet
+            tx_info = {}
+        if future.done():
+            pass
+        elif tx_info.get("pool-error"):
+            future.set_exception(TransactionRejectedError(f"Transaction rejected: {tx_info['pool-error']}"))
+        elif tx_info.get("confirmed-round", 0) > 0:
+            if len(txids) == 1:
+                future.set_result([tx_info])
+            else:
+                # Groups confirmed in the same round share one read of its block
+                round_num = tx_info["confirmed-round"]
+                if round_num not in rounds:
+                    rounds[round_num] = asyncio.ensure_future(self._read_round(round_num))
+                confirmed = await rounds[round_num]
+                future.set_result([confirmed[txid] for txid in txids])
+        elif self._last_round > deadline:
+            future.set_exception(ConfirmationTimeoutError(f"Wait for transaction id {key} timed out"))
+        if future.done():
+            self._pending.pop(key, None)
+
+    async def _run(self):
+        while self._pending:
+            try:
+                status = await async_algod.status_after_block(self._last_round)
+                self._last_round = max(self._last_round, status["last-round"])
+                suggested_params_cache.observe_round(self._last_round)
+                rounds = {}
+                await asyncio.gather(*(self._check(key, rounds) for key in list(self._pending)))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Confirmation tracker could not reach algod: {e}")
+                await asyncio.sleep(1)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        for future, _, _ in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+
+suggested_params_cache = SuggestedParamsCache(SUGGESTED_PARAMS_MAX_AGE)
+confirmation_tracker = ConfirmationTracker(CONFIRMATION_WAIT_ROUNDS)
+
+async def submit_signed(signed_txns: list, resend: bool = False) -> List[str]:
+    """
+    Send signed deployer transactions (a single one or an atomic group)
+    without waiting for confirmation; pair with `confirmation_tracker.wait`.
+
+    With `resend`, the caller is sending again a transaction it recorded
+    before a previous attempt; algod reporting it as already pending or
+    confirmed then means that attempt got through, and the caller simply
+    tracks its txid. Otherwise that reply is an error: a new transaction
+    that matches an existing one byte for byte is someone else's.
+    """
+    txids = [signed.get_txid() for signed in signed_txns]
+    try:
+        if len(signed_txns) == 1:
+            await async_algod.send_transaction(signed_txns[0])
+        else:
+            await async_algod.send_transactions(signed_txns)
+    except AlgodHTTPError as e:
+        if not resend or ("already in ledger" not in str(e) and "transaction already in pool" not in str(e)):
+            raise
+        logging.info(f"Transaction {txids[0]} was already submitted; tracking it")
+    return txids
 
 # ------------------- FastAPI Setup -------------------
+async def warm_up():
+    """
+    Pay the first request's one-off costs at startup: open upstream
+    connections, prime suggested params and spawn render workers. Deployer
+    assets need no warming; they are read from the registry's local view.
+    Failures are logged and left for the first request to retry.
+    """
+    start = time.perf_counter()
+    tasks = {
+        "algod": run_blocking(algod_client.status),
+        "indexer": run_blocking(indexer_client.health),
+    }
+    if not VERIFY_ONLY:
+        tasks["suggested params"] = suggested_params_cache.get()
+        tasks["render workers"] = render_pool.start()
+    results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+    for name, result in zip(tasks, results):
+        if isinstance(result, Exception):
+            logging.warning(f"Warm-up of {name} failed: {result}")
+    logging.info(f"Warm-up finished in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+def require_signing_key():
+    if VERIFY_ONLY:
+        raise HTTPException(status_code=503, detail="This node is verify-only; minting is disabled")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await asyncio.wait_for(warm_up(), WARMUP_TIMEOUT)
+    except asyncio.TimeoutError:
+        logging.warning(f"Warm-up did not finish within {WARMUP_TIMEOUT}s; continuing cold")
+    workers = [] if VERIFY_ONLY else [asyncio.create_task(mint_worker_loop(i)) for i in range(MINT_WORKERS)]
+    workers.append(asyncio.create_task(registry_sync_loop()))
+    workers.append(asyncio.create_task(outbox_sender_loop()))
+    try:
+        yield
+    finally:
+        for task in workers:
+            task.cancel()
+        confirmation_tracker.stop()
+        await asyncio.gather(*workers, return_exceptions=True)
+        await run_blocking(smtp_pool.close)
+        render_pool.shutdown()
+        algod_transport.close()
+        indexer_transport.close()
+
 app = FastAPI(
     title="Unified Algorand POAP API",
     description="Mint, verify, and extract POAP certificates in a single API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# ------------------- Admission Control -------------------
+mint_limiter = RateLimiter("mint_rate", MINT_RATE_LIMIT, MINT_RATE_BURST) if MINT_RATE_LIMIT > 0 else None
+read_limiter = RateLimiter("read_rate", READ_RATE_LIMIT, READ_RATE_BURST) if READ_RATE_LIMIT > 0 else None
+
+def client_key(request: Request) -> str:
+    api_key = request.headers.get("x-api-key")
+    if api_key in API_KEYS:
+        return f"key:{api_key}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+def admit(request: Request, limiter: Optional[RateLimiter], cost: float):
+    """
+    Charge a request costing `cost` tokens in all, or raise 429 with
+    Retry-After. For routes whose cost depends on the body; RateLimit has
+    already taken the first token at the edge.
+    """
+    if limiter is not None:
+        limiter.check(client_key(request), cost, prepaid=1)
+
+# Each request's first token is taken at the edge, before its body is read
+app.add_middleware(RateLimit, client_key=client_key, limiters={
+    prefix: limiter for prefix, limiter in (
+        ("/mint", mint_limiter), ("/verify", read_limiter), ("/get-certificate", read_limiter),
+        ("/certificate", read_limiter), ("/poap/", read_limiter),
+    ) if limiter is not None
+})
+# Oversized uploads are refused before their body is read
+app.add_middleware(BodySizeLimit, default=MAX_UPLOAD_BYTES, limits={"/mint-batch": MAX_BATCH_UPLOAD_BYTES})
+
+# Added after admission control so it wraps it: 413 and 429 responses carry CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -83,8 +511,59 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag", "X-Synced-Round", "Retry-After"],
 )
 
+@app.exception_handler(UpstreamUnavailableError)
+async def upstream_unavailable(request: Request, exc: UpstreamUnavailableError):
+    headers = {"Retry-After": str(max(1, round(exc.retry_after)))}
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers=headers)
+
+# ------------------- Metrics -------------------
+HTTP_REQUEST_SECONDS = Histogram(
+    "poap_http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("poap_http_requests_in_flight", "HTTP requests currently being served")
+MINT_JOBS_IN_FLIGHT = Gauge("poap_mint_jobs_in_flight", "Mint jobs this process is currently working on")
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    timings = []
+    token = request_timings.set(timings)
+    start = time.perf_counter()
+    status = 500
+    try:
+        with HTTP_REQUESTS_IN_FLIGHT.track_in_progress():
+            response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        request_timings.reset(token)
+        # Label by route template, not the raw path, to keep cardinality bounded
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            elapsed, method=request.method, route=route.path if route else "unmatched", status=status
+        )
+    if SERVER_TIMING:
+        response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+    return response
+
+def collect_app_metrics() -> List[str]:
+    lines = []
+    stats = cache_stats()
+    for field, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"), ("size", "gauge")):
+        name = f"poap_cache_{field}_total" if kind == "counter" else f"poap_cache_{field}"
+        lines += [f"# HELP {name} Asset cache {field}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{cache="{cache}"}} {values[field]}' for cache, values in stats.items()]
+    lines += ["# HELP poap_outbox_messages Mail outbox messages by status", "# TYPE poap_outbox_messages gauge"]
+    lines += [f'poap_outbox_messages{{status="{status}"}} {count}' for status, count in mail_outbox.counts().items()]
+    lines += ["# HELP poap_confirmations_pending Transactions awaiting confirmation in this process",
+              "# TYPE poap_confirmations_pending gauge",
+              f"poap_confirmations_pending {confirmation_tracker.pending_count()}"]
+    return lines
+
+REGISTRY.register_collector(collect_app_metrics)
+
 # ------------------- Pydantic Models -------------------
 class VerifyRequest(BaseModel):
     asset_id: int
@@ -109,11 +588,22 @@ def clean_unicode_text(text: str) -> str:
     
     return text
 
-def send_fallback_email(to_email: str, txid: str, asset_id: int, qr_path: str, certificate_path: str):
+def email_configured() -> bool:
+    # A password is only needed for authenticated relays such as Gmail
+    return bool(GMAIL_USER and (GMAIL_PASS or SMTP_HOST != "smtp.gmail.com"))
+
+def send_fallback_email(to_email: str, txid: str, asset_id: int, qr_png: Optional[bytes],
+                        certificate: Union[bytes, memoryview, None], filename: str,
+                        certificate_pdf: Optional[bytes] = None):
     """
     Fallback email function with ASCII-only content
     """
-    logging.info("Attempting to send fallback ASCII-only email...")
+    logging.info("Attempting to queue fallback ASCII-only email...")
+    # Mail modules load on first send so API workers start without them
+    from email.mime.application import MIMEApplication
+    from email.mime.image import MIMEImage
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
     
     # ASCII-safe subject and body
     subject = "Your POAP Certificate"
@@ -142,45 +632,50 @@ BishwasChain Team
         msg.attach(MIMEText(body, "plain", "utf-8"))
 
         # Attach files
-        if os.path.exists(qr_path):
-            with open(qr_path, "rb") as f:
-                img_part = MIMEImage(f.read(), name=f"qr_{asset_id}.png")
-                img_part.add_header('Content-Disposition', f'attachment; filename="qr_{asset_id}.png"')
-                msg.attach(img_part)
-
-        if os.path.exists(certificate_path):
-            with open(certificate_path, "rb") as f:
-                file_data = f.read()
-                content_type = guess_type(certificate_path)[0] or 'application/octet-stream'
-                maintype, subtype = content_type.split('/')
-                attachment_part = MIMEApplication(file_data, _subtype=subtype)
-                filename = os.path.basename(certificate_path)
-                attachment_part.add_header("Content-Disposition", f'attachment; filename="{filename}"')
-                msg.attach(attachment_part)
+        if certificate_pdf:
+            pdf_part = MIMEApplication(certificate_pdf, _subtype="pdf")
+            pdf_part.add_header("Content-Disposition", f'attachment; filename="poap_certificate_{asset_id}.pdf"')
+            msg.attach(pdf_part)
+
+        if qr_png:
+            img_part = MIMEImage(bytes(qr_png), name=f"qr_{asset_id}.png")
+            img_part.add_header('Content-Disposition', f'attachment; filename="qr_{asset_id}.png"')
+            msg.attach(img_part)
 
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.ehlo()
-            server.starttls()
-            server.ehlo()
-            server.login(GMAIL_USER, GMAIL_PASS)
-            server.send_message(msg)
+        if certificate is not None:
+            content_type = guess_type(filename)[0] or 'application/octet-stream'
+            maintype, subtype = content_type.split('/')
+            attachment_part = MIMEApplication(bytes(certificate), _subtype=subtype)
+            attachment_part.add_header("Content-Disposition", f'attachment; filename="{filename}"')
+            msg.attach(attachment_part)
 
-        logging.info(f"Fallback email successfully sent to {to_email}")
+        mail_outbox.enqueue(to_email, msg.as_bytes())
+        logging.info(f"Fallback email queued for {to_email}")
         return True
         
     except Exception as e:
         logging.error(f"Fallback email failed: {e}")
         return False
 
-def send_certificate_email(to_email: str, txid: str, asset_id: int, qr_path: str, certificate_path: str):
+def send_certificate_email(to_email: str, txid: str, asset_id: int, qr_png: Optional[bytes],
+                           certificate: Union[bytes, memoryview, None], filename: str,
+                           certificate_pdf: Optional[bytes] = None):
     """
-    Send both certificate PDF, QR code image, and the original certificate file via Gmail.
+    Queue the certificate PDF, QR code image, and the original certificate file for delivery via the SMTP outbox.
     Enhanced version with proper Unicode handling.
+    Attachments are taken from memory (`qr_png`, `certificate`); `filename` names the certificate attachment.
+    Returns True once the message is durably queued; the outbox sender retries delivery.
     """
-    if not GMAIL_USER or not GMAIL_PASS:
+    if not email_configured():
         logging.warning("Gmail credentials missing. Skipping email.")
         return False
 
+    from email.header import Header
+    from email.mime.application import MIMEApplication
+    from email.mime.image import MIMEImage
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
     # Clean subject and body to handle Unicode characters
     subject = "Your POAP Certificate 🎉"
     body = f"""Congratulations!
@@ -210,72 +705,141 @@ BishwasChain
         # Add body with UTF-8 encoding
         msg.attach(MIMEText(body, "plain", "utf-8"))
 
+        # Attach rendered certificate PDF
+        if certificate_pdf:
+            try:
+                pdf_part = MIMEApplication(certificate_pdf, _subtype="pdf")
+                pdf_part.add_header('Content-Disposition', f'attachment; filename="poap_certificate_{asset_id}.pdf"')
+                msg.attach(pdf_part)
+            except Exception as e:
+                logging.warning(f"Failed to attach certificate PDF: {e}")
+
         # Attach QR code image
-        try:
-            with open(qr_path, "rb") as f:
-                img_data = f.read()
-                img_part = MIMEImage(img_data, name=f"qr_{asset_id}.png")
+        if qr_png:
+            try:
+                img_part = MIMEImage(bytes(qr_png), name=f"qr_{asset_id}.png")
                 img_part.add_header('Content-Disposition', f'attachment; filename="qr_{asset_id}.png"')
-            msg.attach(img_part)
-        except FileNotFoundError:
-            logging.warning(f"QR code file not found: {qr_path}")
-        except Exception as e:
-            logging.warning(f"Failed to attach QR code: {e}")
+                msg.attach(img_part)
+            except Exception as e:
+                logging.warning(f"Failed to attach QR code: {e}")
+        else:
+            logging.warning(f"No QR code rendered for asset {asset_id}")
 
         # Attach original certificate file
-        try:
-            with open(certificate_path, "rb") as f:
-                file_data = f.read()
-                
+        if certificate is not None:
+            try:
                 # Guess the MIME type safely
-                content_type = guess_type(certificate_path)[0]
+                content_type = guess_type(filename)[0]
                 if content_type:
                     maintype, subtype = content_type.split('/')
                 else:
                     # Default to application/octet-stream if type can't be determined
                     maintype, subtype = 'application', 'octet-stream'
                 
-                attachment_part = MIMEApplication(file_data, _subtype=subtype)
-                filename = os.path.basename(certificate_path)
+                attachment_part = MIMEApplication(bytes(certificate), _subtype=subtype)
                 attachment_part.add_header(
                     "Content-Disposition", 
                     f'attachment; filename="{filename}"'
                 )
-            msg.attach(attachment_part)
-        except FileNotFoundError:
-            logging.warning(f"Certificate file not found: {certificate_path}")
-        except Exception as e:
-            logging.warning(f"Failed to attach certificate: {e}")
+                msg.attach(attachment_part)
+            except Exception as e:
+                logging.warning(f"Failed to attach certificate: {e}")
+        else:
+            logging.warning(f"No certificate file to attach for asset {asset_id}")
 
-        # Send email with proper error handling
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.ehlo()
-            server.starttls()
-            server.ehlo()
-            server.login(GMAIL_USER, GMAIL_PASS)
-            
-            # Use send_message instead of sendmail for better Unicode handling
-            server.send_message(msg)
+        # Serialize now so the outbox owns a self-contained copy
+        mail_outbox.enqueue(to_email, msg.as_bytes())
             
-        logging.info(f"Certificate email successfully sent to {to_email}")
+        logging.info(f"Certificate email queued for {to_email}")
         return True
 
-    except smtplib.SMTPAuthenticationError as e:
-        logging.error(f"SMTP Authentication Error: {e}")
-        logging.error("Make sure you use a Gmail App Password, not your normal password.")
-        return False
     except UnicodeEncodeError as e:
         logging.error(f"Unicode encoding error: {e}")
         # Try fallback with ASCII-only content
         try:
-            return send_fallback_email(to_email, txid, asset_id, qr_path, certificate_path)
+            return send_fallback_email(to_email, txid, asset_id, qr_png, certificate, filename, certificate_pdf)
         except Exception as fallback_error:
             logging.error(f"Fallback email also failed: {fallback_error}")
             return False
     except Exception as e:
-        logging.error(f"Failed to send email: {type(e).__name__}: {e}")
+        logging.error(f"Failed to queue email: {type(e).__name__}: {e}")
         return False
 
+# ------------------- Asset Snapshots -------------------
+@dataclass
+class AssetSnapshot:
+    """
+    Everything verification and certificate extraction need about one asset,
+    fetched once: algod asset info plus the decoded creation note.
+    `synced_round` and `updated_round` are set when the params came from
+    the local registry view rather than algod: the round the view is current
+    to, and the round the asset's params last changed in.
+    """
+    asset_id: int
+    asset_info: dict
+    note_content: object
+    certificate_hash: Optional[str]
+    synced_round: Optional[int] = None
+    updated_round: Optional[int] = None
+
+    @property
+    def params(self) -> dict:
+        return self.asset_info.get("params", {})
+
+    @property
+    def metadata(self) -> dict:
+        return self.note_content if isinstance(self.note_content, dict) else {}
+
+def decode_note(note_b64: Optional[str]):
+    """
+    Decode a base64 creation note of any version (see notes.py): a dict for
+    POAP notes, the raw text otherwise, None if empty.
+    """
+    if not note_b64:
+        return None
+    return decode_note_bytes(base64.b64decode(note_b64, validate=False))
+
+def build_asset_snapshot(asset_id: int, asset_info: dict, note_b64: Optional[str]) -> AssetSnapshot:
+    metadata_hash_b64 = asset_info.get("params", {}).get("metadata-hash", "")
+    certificate_hash = None
+    if metadata_hash_b64:
+        try:
+            certificate_hash = binascii.hexlify(base64.b64decode(metadata_hash_b64)).decode()
+        except binascii.Error:
+            certificate_hash = None
+    note_content = decode_note(note_b64)
+    if isinstance(note_content, dict) and certificate_hash:
+        # Version 2 notes leave the hash to the metadata-hash; keep it in the response
+        note_content.setdefault("certificate_hash", certificate_hash)
+    return AssetSnapshot(asset_id, asset_info, note_content, certificate_hash,
+                         asset_info.get("synced-round"), asset_info.get("updated-round"))
+
+def resolve_creation_note_safely(asset_id: int, indexer=None) -> Optional[str]:
+    # A missing note degrades the result but should not fail the request
+    try:
+        return resolve_creation_note(asset_id, indexer)
+    except Exception as e:
+        logging.warning(f"Could not resolve creation note for asset {asset_id}: {e}")
+        return None
+
+def fetch_asset_snapshot(asset_id: int, algod=None, indexer=None) -> AssetSnapshot:
+    """
+    Blocking snapshot loader for sync callers.
+    """
+    asset_info = get_cached_asset_info(algod or algod_client, asset_id)
+    note_b64 = resolve_creation_note_safely(asset_id, indexer) if (indexer or indexer_client) else None
+    return build_asset_snapshot(asset_id, asset_info, note_b64)
+
+async def load_asset_snapshot(asset_id: int) -> AssetSnapshot:
+    """
+    Fetch algod asset info and the indexer creation note in parallel.
+    """
+    asset_info, note_b64 = await asyncio.gather(
+        run_blocking(get_cached_asset_info, algod_client, asset_id),
+        run_blocking(resolve_creation_note_safely, asset_id)
+    )
+    return build_asset_snapshot(asset_id, asset_info, note_b64)
+
 # ------------------- POAP Verifier -------------------
 class POAPVerifier:
     def __init__(self, algod_client, indexer_client=None):
@@ -283,7 +847,7 @@ class POAPVerifier:
         self.indexer_client = indexer_client
 
     def get_asset_info(self, asset_id):
-        return self.algod_client.asset_info(asset_id)
+        return get_cached_asset_info(self.algod_client, asset_id)
 
     def verify_poap_structure(self, asset_info):
         params = asset_info.get("params", {})
@@ -295,161 +859,1439 @@ class POAPVerifier:
         }
         return verification_results, params
 
-    def get_asset_transactions(self, asset_id, limit=10):
-        if not self.indexer_client:
-            return []
-        response = self.indexer_client.search_asset_transactions(asset_id=asset_id, limit=limit)
-        return response.get("transactions", [])
-
-    def extract_note_from_creation_tx(self, asset_id):
-        transactions = self.get_asset_transactions(asset_id, limit=50)
-        for tx in transactions:
-            if tx.get("tx-type") == "acfg" and tx.get("created-asset-index") == asset_id:
-                note_b64 = tx.get("note")
-                if not note_b64:
-                    return None
-                note_bytes = base64.b64decode(note_b64, validate=False)
-                try:
-                    return json.loads(note_bytes.decode("utf-8"))
-                except:
-                    return note_bytes.decode("utf-8", errors="ignore")
-        return None
-
-    def comprehensive_verification(self, asset_id):
-        asset_info = self.get_asset_info(asset_id)
-        verification_results, params = self.verify_poap_structure(asset_info)
-        note_content = self.extract_note_from_creation_tx(asset_id)
+    def verify_snapshot(self, snapshot: AssetSnapshot):
+        verification_results, params = self.verify_poap_structure(snapshot.asset_info)
         passed_checks = sum(verification_results.values())
         total_checks = len(verification_results)
         overall_valid = passed_checks == total_checks
         return {
-            "asset_id": asset_id,
+            "asset_id": snapshot.asset_id,
             "asset_info": params,
             "verification_results": verification_results,
-            "note_content": note_content,
+            "note_content": snapshot.note_content,
             "overall_valid": overall_valid,
+            "synced_round": snapshot.synced_round,
         }
 
 # ------------------- Certificate Extractor -------------------
-def get_certificate_details_from_asset_id(asset_id):
+def certificate_details_from_snapshot(snapshot: AssetSnapshot) -> dict:
+    params = snapshot.params
+    full_metadata = snapshot.metadata
+
+    certificate_details = {
+        "event": full_metadata.get("event", "Data not available"),
+        "organizer": full_metadata.get("organizer", "Data not available"),
+        "date": full_metadata.get("date", "Data not available"),
+        "recipient_name": full_metadata.get("recipient_name", "Data not available"),
+        "recipient_address": full_metadata.get("recipient_address", "Data not available"),
+        "issued_at": full_metadata.get("issued_at"),
+        "poap_version": full_metadata.get("poap_version"),
+        "type": full_metadata.get("type")
+    }
+
+    asset_basic_info = {
+        "name": params.get("name"),
+        "creator": params.get("creator"),
+        "url": params.get("url"),
+        "unit_name": params.get("unit-name")
+    }
+
+    return {
+        "success": True,
+        "asset_id": snapshot.asset_id,
+        "certificate_hash": snapshot.certificate_hash,
+        "certificate_details": certificate_details,
+        "asset_info": asset_basic_info,
+        "full_metadata": full_metadata,
+        "synced_round": snapshot.synced_round
+    }
+
+def read_spooled_file(path: str) -> Optional[bytes]:
     try:
-        asset_info = algod_client.asset_info(asset_id)
-        params = asset_info.get("params", {})
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        logging.warning(f"Certificate file not found: {path}")
+        return None
+
+def remove_temp_files(*paths: str):
+    try:
+        for path in paths:
+            if os.path.exists(path):
+                os.remove(path)
+    except Exception as e:
+        logging.warning(f"Failed to clean up temporary files: {e}")
+
+# ------------------- HTTP Caching -------------------
+def snapshot_etag(snapshot: AssetSnapshot) -> str:
+    """
+    Strong validator for a response built from `snapshot`. Registry-view
+    assets are versioned by the round their params last changed in; assets
+    read from algod by a digest of their params and note.
+    """
+    if snapshot.updated_round is not None:
+        version = f"round:{snapshot.updated_round}"
+    else:
+        version = json.dumps([snapshot.params, snapshot.note_content], sort_keys=True, default=str)
+    tag = f"{snapshot.asset_id}:{version}:{snapshot.certificate_hash}:{deployer_address}"
+    return '"' + hashlib.sha256(tag.encode("utf-8")).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/ tags match too
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def without_synced_round(result: dict) -> dict:
+    # The view's round moves every block; cacheable bodies carry it as X-Synced-Round instead
+    return {k: v for k, v in result.items() if k != "synced_round"}
+
+def cacheable_response(request: Request, snapshot: AssetSnapshot, build_body) -> Response:
+    """
+    Response for a GET route over one asset, with ETag, Cache-Control and
+    X-Synced-Round. A client whose If-None-Match is current gets 304 and the
+    body is never built.
+    """
+    headers = {
+        "ETag": snapshot_etag(snapshot),
+        "Cache-Control": f"public, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate",
+    }
+    if snapshot.synced_round is not None:
+        headers["X-Synced-Round"] = str(snapshot.synced_round)
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=build_body(snapshot), headers=headers)
+
+def poap_page(snapshot: AssetSnapshot) -> dict:
+    """Verification and certificate details for one asset: /certificate/{asset_id} and /poap/{hash}."""
+    verifier = POAPVerifier(algod_client, indexer_client)
+    return {
+        "asset_id": snapshot.asset_id,
+        "verification": without_synced_round(verifier.verify_snapshot(snapshot)),
+        "certificate": without_synced_round(certificate_details_from_snapshot(snapshot))
+    }
+
+def publish_poap_page(asset_id: int):
+    """
+    Write the static page of a deployer asset to POAP_STATIC_DIR, or remove
+    it once the asset is destroyed.
+    """
+    local = certificate_registry.get_asset(asset_id)
+    if local is None:
+        return
+    params, deleted = local[0], local[1]
+    metadata_hash = params.get("metadata-hash")
+    if not metadata_hash:
+        return
+    certificate_hash = base64.b64decode(metadata_hash).hex()
+    # A file minted more than once is published under the asset the registry resolves it to
+    if certificate_registry.lookup(certificate_hash) != asset_id:
+        return
+    path = os.path.join(POAP_STATIC_DIR, f"{certificate_hash}.json")
+    if deleted:
+        remove_temp_files(path)
+        return
+    page = poap_page(fetch_asset_snapshot(asset_id))
+    fd, tmp_path = tempfile.mkstemp(suffix=".json", dir=POAP_STATIC_DIR)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(page, f)
+        # mkstemp creates files readable only by us; the web server needs to read them
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        remove_temp_files(tmp_path)
+        raise
+
+def publish_poap_pages(asset_ids: List[int]):
+    for asset_id in asset_ids:
+        try:
+            publish_poap_page(asset_id)
+        except Exception as e:
+            logging.warning(f"Could not publish static page for asset {asset_id}: {e}")
+
+# ------------------- Local Database -------------------
+_db_local = threading.local()
+
+def get_db() -> sqlite3.Connection:
+    """
+    Per-thread SQLite connection in autocommit mode; callers open explicit
+    transactions where they need atomicity across processes.
+    """
+    conn = getattr(_db_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(POAP_DB_PATH, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        _db_local.conn = conn
+    return conn
+
+# ------------------- Mail Delivery -------------------
+class SMTPPool:
+    """
+    Small pool of authenticated SMTP connections reused across messages.
+    A connection that fails mid-send is dropped and the send is retried once
+    on a fresh connection; anything else surfaces to the outbox for backoff.
+    """
+    def __init__(self, size: int):
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> "smtplib.SMTP":
+        import smtplib
+        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        server.ehlo()
+        if SMTP_STARTTLS:
+            server.starttls()
+            server.ehlo()
+        if GMAIL_PASS:
+            server.login(GMAIL_USER, GMAIL_PASS)
+        return server
+
+    def _checkout(self) -> "smtplib.SMTP":
+        import smtplib
+        with self._lock:
+            entry = self._idle.pop() if self._idle else None
+        if entry is not None:
+            server, last_used = entry
+            if time.time() - last_used < SMTP_IDLE_CHECK:
+                return server
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except smtplib.SMTPException:
+                pass
+            self._discard(server)
+        return self._connect()
+
+    def _discard(self, server: "smtplib.SMTP"):
+        try:
+            server.close()
+        except Exception:
+            pass
 
-        # Metadata hash
-        metadata_hash_b64 = params.get("metadata-hash", "")
-        certificate_hash = None
-        if metadata_hash_b64:
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        server = None
+        try:
+            server = self._checkout()
+            yield server
+            with self._lock:
+                self._idle.append((server, time.time()))
+        except Exception:
+            if server is not None:
+                self._discard(server)
+            raise
+        finally:
+            self._slots.release()
+
+    def send(self, from_addr: str, to_addr: str, message: bytes):
+        import smtplib
+        for attempt in range(2):
+            try:
+                with self.connection() as server:
+                    server.sendmail(from_addr, [to_addr], message)
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                if attempt:
+                    raise
+                logging.info(f"SMTP connection dropped ({e}); reconnecting")
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
             try:
-                certificate_hash = binascii.hexlify(base64.b64decode(metadata_hash_b64)).decode()
-            except:
-                certificate_hash = None
+                server.quit()
+            except Exception:
+                self._discard(server)
+
+smtp_pool = SMTPPool(SMTP_POOL_SIZE)
+
+class MailOutbox:
+    """
+    Persistent outbox of serialized messages in POAP_DB_PATH. Messages are
+    claimed with a lease like mint jobs and retried with exponential backoff
+    until OUTBOX_MAX_ATTEMPTS is reached.
+    """
+    LEASE_SECONDS = 300
+
+    def __init__(self):
+        get_db().executescript("""
+            CREATE TABLE IF NOT EXISTS mail_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                recipient TEXT NOT NULL,
+                message BLOB NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                next_attempt_at REAL NOT NULL,
+                lease_expires REAL,
+                created_at REAL NOT NULL,
+                sent_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_mail_outbox_claim ON mail_outbox (status, next_attempt_at);
+        """)
+
+    def enqueue(self, recipient: str, message: bytes) -> int:
+        now = time.time()
+        cursor = get_db().execute(
+            "INSERT INTO mail_outbox (recipient, message, status, next_attempt_at, created_at) "
+            "VALUES (?, ?, 'pending', ?, ?)",
+            (recipient, message, now, now)
+        )
+        return cursor.lastrowid
 
-        # Fetch creation transaction for note
-        full_metadata = {}
+    def claim(self, limit: int) -> List[dict]:
+        conn = get_db()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
         try:
-            response = indexer_client.search_asset_transactions(
-                asset_id=asset_id, tx_type="acfg", limit=50
+            rows = conn.execute(
+                "SELECT id, recipient, message, attempts FROM mail_outbox "
+                "WHERE (status = 'pending' AND next_attempt_at <= ?) OR (status = 'sending' AND lease_expires < ?) "
+                "ORDER BY next_attempt_at LIMIT ?",
+                (now, now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE mail_outbox SET status = 'sending', attempts = attempts + 1, lease_expires = ? WHERE id = ?",
+                [(now + self.LEASE_SECONDS, row["id"]) for row in rows]
             )
-            transactions = response.get("transactions", [])
-            creation_tx = next(
-                (tx for tx in transactions if tx.get("tx-type") == "acfg" and tx.get("created-asset-index") == asset_id),
-                None
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return [dict(row, attempts=row["attempts"] + 1) for row in rows]
+
+    def mark_sent(self, message_id: int):
+        get_db().execute(
+            "UPDATE mail_outbox SET status = 'sent', sent_at = ?, lease_expires = NULL, last_error = NULL, "
+            "message = x'' WHERE id = ?",
+            (time.time(), message_id)
+        )
+
+    def mark_failed(self, message_id: int, attempts: int, error: str):
+        if attempts >= OUTBOX_MAX_ATTEMPTS:
+            get_db().execute(
+                "UPDATE mail_outbox SET status = 'failed', last_error = ?, lease_expires = NULL WHERE id = ?",
+                (error, message_id)
             )
-            if creation_tx:
-                note_b64 = creation_tx.get("note", "")
-                if note_b64:
-                    note_bytes = base64.b64decode(note_b64)
-                    full_metadata = json.loads(note_bytes.decode("utf-8"))
-        except:
-            pass
+            return
+        # Exponential backoff with jitter, capped at one hour
+        delay = min(3600, 5 * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+        get_db().execute(
+            "UPDATE mail_outbox SET status = 'pending', last_error = ?, next_attempt_at = ?, lease_expires = NULL "
+            "WHERE id = ?",
+            (error, time.time() + delay, message_id)
+        )
 
-        certificate_details = {
-            "event": full_metadata.get("event", "Data not available"),
-            "organizer": full_metadata.get("organizer", "Data not available"),
-            "date": full_metadata.get("date", "Data not available"),
-            "recipient_name": full_metadata.get("recipient_name", "Data not available"),
-            "recipient_address": full_metadata.get("recipient_address", "Data not available"),
-            "issued_at": full_metadata.get("issued_at"),
-            "poap_version": full_metadata.get("poap_version"),
-            "type": full_metadata.get("type")
-        }
+    def counts(self) -> dict:
+        rows = get_db().execute("SELECT status, COUNT(*) AS n FROM mail_outbox GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
 
-        asset_basic_info = {
-            "name": params.get("name"),
-            "creator": params.get("creator"),
-            "url": params.get("url"),
-            "unit_name": params.get("unit-name")
-        }
+mail_outbox = MailOutbox()
 
-        return {
-            "success": True,
-            "asset_id": asset_id,
-            "certificate_hash": certificate_hash,
-            "certificate_details": certificate_details,
-            "asset_info": asset_basic_info,
-            "full_metadata": full_metadata
-        }
-    except AlgodHTTPError as e:
-        return {"success": False, "asset_id": asset_id, "error": str(e)}
+def deliver_outbox_message(entry: dict) -> bool:
+    import smtplib
+    try:
+        with stage_timer("email", "send"):
+            smtp_pool.send(GMAIL_USER, entry["recipient"], entry["message"])
+        mail_outbox.mark_sent(entry["id"])
+        logging.info(f"Certificate email successfully sent to {entry['recipient']}")
+        return True
+    except smtplib.SMTPAuthenticationError as e:
+        logging.error(f"SMTP Authentication Error: {e}")
+        logging.error("Make sure you use a Gmail App Password, not your normal password.")
+        mail_outbox.mark_failed(entry["id"], entry["attempts"], str(e))
     except Exception as e:
-        return {"success": False, "asset_id": asset_id, "error": f"Unexpected error: {e}"}
+        logging.error(f"Failed to send email to {entry['recipient']}: {type(e).__name__}: {e}")
+        mail_outbox.mark_failed(entry["id"], entry["attempts"], f"{type(e).__name__}: {e}")
+    return False
 
-def generate_qr_image(asset_id):
-    """Generate QR code image in memory containing just the asset ID."""
-    qr = qrcode.QRCode(version=1, box_size=10, border=4)
-    qr.add_data(str(asset_id))
-    qr.make(fit=True)
-    img = qr.make_image(fill="black", back_color="white")
-    return img
+async def outbox_sender_loop():
+    while True:
+        try:
+            batch = await run_blocking(mail_outbox.claim, OUTBOX_BATCH_SIZE)
+        except sqlite3.OperationalError as e:
+            logging.warning(f"Outbox sender could not claim messages: {e}")
+            batch = []
 
-def generate_certificate_pdf(asset_id, certificate_details):
-    """Generate a professional PDF certificate with embedded QR code."""
-    qr_img = generate_qr_image(asset_id)
-    qr_path = os.path.join(TEMP_FOLDER, f"qr_{asset_id}.png")
-    qr_img.save(qr_path)
-    return qr_path
+        if not batch:
+            await asyncio.sleep(OUTBOX_POLL_INTERVAL)
+            continue
 
-def find_certificate_on_chain(cert_hash: str):
+        # Never park more executor threads on the pool than it has connections
+        slots = asyncio.Semaphore(SMTP_POOL_SIZE)
+
+        async def deliver(entry):
+            async with slots:
+                return await run_blocking(deliver_outbox_message, entry)
+        await asyncio.gather(*(deliver(entry) for entry in batch))
+
+# ------------------- Caching -------------------
+class SQLiteCacheBackend:
+    """
+    Shared second-level cache in POAP_DB_PATH, so every worker process on the
+    host can reuse entries another worker already fetched.
+    """
+    PURGE_EVERY = 1000
+
+    def __init__(self):
+        self._writes = 0
+        get_db().execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+
+    def get(self, key: str):
+        row = get_db().execute(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return (json.loads(row["value"]), row["expires_at"]) if row else None
+
+    def set(self, key: str, value, expires_at: float):
+        conn = get_db()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), expires_at)
+        )
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with per-entry expiry and hit/miss/eviction counters.
+    Falls through to an optional shared backend on a local miss. Expired
+    entries stay in place until evicted or replaced, for `get_stale`.
+    """
+    def __init__(self, name: str, maxsize: int, ttl: float, backend=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+
+        if self.backend is not None:
+            shared = self.backend.get(f"{self.name}:{key}")
+            if shared is not None:
+                value, expires_at = shared
+                self._store(key, value, expires_at)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def get_stale(self, key, default=None):
+        """The local entry for `key` even if expired; for when the upstream cannot be reached."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[1] if entry is not None else default
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._store(key, value, expires_at)
+        if self.backend is not None:
+            self.backend.set(f"{self.name}:{key}", value, expires_at)
+
+    def _store(self, key, value, expires_at: float):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+cache_backend = SQLiteCacheBackend() if CACHE_BACKEND == "sqlite" else None
+asset_params_cache = TTLCache("asset_params", ASSET_CACHE_SIZE, IMMUTABLE_CACHE_TTL, cache_backend)
+asset_mutable_cache = TTLCache("asset_mutable", ASSET_CACHE_SIZE, MUTABLE_CACHE_TTL, cache_backend)
+creation_note_cache = TTLCache("creation_note", ASSET_CACHE_SIZE, IMMUTABLE_CACHE_TTL, cache_backend)
+
+# Asset params that the manager can still change after creation
+MUTABLE_ASSET_FIELDS = ("manager", "reserve", "freeze", "clawback")
+
+def get_cached_asset_info(client, asset_id: int) -> dict:
     """
-    Given a 64-char hex SHA256 cert_hash, check if any Algorand asset has it.
-    Returns asset_id + metadata if found, else None.
+    algod asset_info with immutable params cached long-term and the mutable
+    role addresses cached for MUTABLE_CACHE_TTL. If algod cannot be reached,
+    expired entries are served rather than failing.
+
+    Deployer assets are answered from the certificate registry's local view
+    first, tagged with the round it is synced to.
     """
+    local = certificate_registry.get_asset(asset_id)
+    if local is not None:
+        params, deleted, updated_round, synced_round = local
+        if deleted:
+            raise AlgodHTTPError("asset does not exist", 404)
+        return {"index": asset_id, "params": params, "updated-round": updated_round, "synced-round": synced_round}
+
+    immutable = asset_params_cache.get(asset_id)
+    if immutable is not None:
+        mutable = asset_mutable_cache.get(asset_id)
+        if mutable is not None:
+            return {"index": asset_id, "params": {**immutable, **mutable}}
+
     try:
-        digest = binascii.unhexlify(cert_hash)
-        
-        # Search on Algorand Indexer for assets
-        # Note: Indexer allows search by metadata_hash only in asset_info
-        response = indexer_client.search_assets(asset_creator=deployer_address)
-        assets = response.get("assets", [])
-
-        for asset in assets:
-            params = asset.get("params", {})
-            mh = params.get("metadata-hash")
-            if mh:
+        asset_info = client.asset_info(asset_id)
+    except UpstreamUnavailableError as e:
+        immutable = asset_params_cache.get_stale(asset_id)
+        if immutable is None:
+            raise
+        logging.warning(f"Serving cached params for asset {asset_id}: {e}")
+        return {"index": asset_id, "params": {**immutable, **asset_mutable_cache.get_stale(asset_id, {})}}
+    params = asset_info.get("params", {})
+    asset_params_cache.set(asset_id, {k: v for k, v in params.items() if k not in MUTABLE_ASSET_FIELDS})
+    asset_mutable_cache.set(asset_id, {k: params[k] for k in MUTABLE_ASSET_FIELDS if k in params})
+    return asset_info
+
+def cache_stats() -> dict:
+    return {cache.name: cache.stats() for cache in (asset_params_cache, asset_mutable_cache, creation_note_cache)}
+
+# ------------------- Certificate Registry -------------------
+class CertificateRegistry:
+    """
+    Local materialized view of every asset the deployer created: params,
+    creation note, and an index from SHA-256 certificate hash (the asset's
+    metadata-hash) to asset ID.
+
+    Entries are written when our own mints confirm and by an incremental
+    indexer sync that pages through the deployer's `acfg` transactions
+    starting after the last synced round, applying creations, reconfigures
+    and destroys in order, so lookups never leave the process.
+    """
+    def __init__(self):
+        self._sync_lock = threading.Lock()
+        self._last_miss_sync = 0.0
+        conn = get_db()
+        had_asset_view = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'assets'"
+        ).fetchone() is not None
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS certificates (
+                cert_hash TEXT PRIMARY KEY,
+                asset_id INTEGER NOT NULL,
+                confirmed_round INTEGER,
+                recorded_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS sync_state (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS asset_notes (
+                asset_id INTEGER PRIMARY KEY,
+                note TEXT NOT NULL,
+                created_round INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS assets (
+                asset_id INTEGER PRIMARY KEY,
+                params TEXT NOT NULL,
+                created_round INTEGER,
+                updated_round INTEGER,
+                deleted INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        if "txid" not in {row["name"] for row in conn.execute("PRAGMA table_info(assets)")}:
+            conn.execute("ALTER TABLE assets ADD COLUMN txid TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_assets_txid ON assets (txid)")
+        if not had_asset_view and self.synced_round():
+            # Registry predates the asset view: walk the deployer's history again to fill it
+            logging.info("Certificate registry gained an asset view; resyncing from the first round")
+            conn.execute("DELETE FROM sync_state WHERE key = 'registry_round'")
+        # Last round registry_sync_loop brought the view up to, for /health without a database read
+        self.last_synced_round = self.synced_round()
+
+    def record(self, cert_hash: str, asset_id: int, confirmed_round: Optional[int] = None,
+               note_b64: Optional[str] = None, params: Optional[dict] = None, txid: Optional[str] = None):
+        if note_b64 is not None:
+            self.record_note(asset_id, note_b64, confirmed_round)
+        if params is not None:
+            self.record_asset(asset_id, params, confirmed_round, txid)
+        # Keep the earliest asset if the same file was ever minted twice
+        get_db().execute(
+            "INSERT INTO certificates (cert_hash, asset_id, confirmed_round, recorded_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(cert_hash) DO UPDATE SET "
+            "confirmed_round = CASE WHEN excluded.asset_id < asset_id THEN excluded.confirmed_round ELSE confirmed_round END, "
+            "asset_id = MIN(asset_id, excluded.asset_id)",
+            (cert_hash, asset_id, confirmed_round, time.time())
+        )
+
+    def record_many(self, entries: List[tuple]):
+        conn = get_db()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for entry in entries:
+                self.record(*entry)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def record_note(self, asset_id: int, note_b64: str, created_round: Optional[int] = None):
+        get_db().execute(
+            "INSERT OR IGNORE INTO asset_notes (asset_id, note, created_round) VALUES (?, ?, ?)",
+            (asset_id, note_b64, created_round)
+        )
+
+    def record_asset(self, asset_id: int, params: dict, created_round: Optional[int] = None,
+                     txid: Optional[str] = None):
+        get_db().execute(
+            "INSERT OR IGNORE INTO assets (asset_id, params, created_round, updated_round, txid) VALUES (?, ?, ?, ?, ?)",
+            (asset_id, json.dumps(params), created_round, created_round, txid)
+        )
+
+    def created_by(self, txid: str) -> Optional[tuple]:
+        """(asset ID, creation round) of the asset the transaction `txid` created, if it is in the view."""
+        row = get_db().execute("SELECT asset_id, created_round FROM assets WHERE txid = ?", (txid,)).fetchone()
+        return (row["asset_id"], row["created_round"]) if row else None
+
+    def reconfigure_asset(self, asset_id: int, mutable: dict, round_num: int):
+        conn = get_db()
+        row = conn.execute(
+            "SELECT params FROM assets WHERE asset_id = ? AND updated_round <= ?", (asset_id, round_num)
+        ).fetchone()
+        if row is None:
+            return
+        if mutable.get("manager", deployer_address) != deployer_address:
+            # Reconfigures by the new manager won't show up in our sync; leave this asset to algod
+            conn.execute("DELETE FROM assets WHERE asset_id = ?", (asset_id,))
+            return
+        params = {k: v for k, v in json.loads(row["params"]).items() if k not in MUTABLE_ASSET_FIELDS}
+        conn.execute(
+            "UPDATE assets SET params = ?, updated_round = ? WHERE asset_id = ?",
+            (json.dumps({**params, **mutable}), round_num, asset_id)
+        )
+
+    def destroy_asset(self, asset_id: int, round_num: int):
+        get_db().execute(
+            "UPDATE assets SET deleted = 1, updated_round = ? WHERE asset_id = ? AND updated_round <= ?",
+            (round_num, asset_id, round_num)
+        )
+
+    def get_asset(self, asset_id: int) -> Optional[tuple]:
+        """
+        (params, deleted, round of the last config change, round the view is
+        current to) for a deployer asset, or None if it is not in the view.
+        """
+        row = get_db().execute(
+            "SELECT params, deleted, updated_round, "
+            "(SELECT value FROM sync_state WHERE key = 'registry_round') AS synced_round "
+            "FROM assets WHERE asset_id = ?", (asset_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        updated_round = row["updated_round"] or 0
+        return json.loads(row["params"]), bool(row["deleted"]), updated_round, max(row["synced_round"] or 0, updated_round)
+
+    def apply_transaction(self, tx: dict) -> Optional[int]:
+        """Apply one deployer `acfg` transaction from the indexer. Returns the asset ID it touched."""
+        config = tx.get("asset-config-transaction", {})
+        params = config.get("params") or {}
+        round_num = tx.get("confirmed-round")
+        asset_id = tx.get("created-asset-index")
+        if asset_id:
+            # The indexer leaves out zero values and the creator, which algod reports
+            params = {"decimals": 0, "default-frozen": False, **params, "creator": tx.get("sender")}
+            metadata_hash = params.get("metadata-hash")
+            if metadata_hash:
+                self.record(base64.b64decode(metadata_hash).hex(), asset_id, round_num, tx.get("note", ""), params,
+                            tx.get("id"))
+            else:
+                self.record_note(asset_id, tx.get("note", ""), round_num)
+                self.record_asset(asset_id, params, round_num, tx.get("id"))
+            return asset_id
+        asset_id = config.get("asset-id")
+        if asset_id:
+            # An acfg with no role addresses left is a destroy
+            mutable = {k: params[k] for k in MUTABLE_ASSET_FIELDS if params.get(k)}
+            if mutable:
+                self.reconfigure_asset(asset_id, mutable, round_num)
+            else:
+                self.destroy_asset(asset_id, round_num)
+            return asset_id
+        return None
+
+    def get_note(self, asset_id: int) -> Optional[str]:
+        row = get_db().execute("SELECT note FROM asset_notes WHERE asset_id = ?", (asset_id,)).fetchone()
+        return row["note"] if row else None
+
+    def get_notes(self, asset_ids: List[int]) -> dict:
+        if not asset_ids:
+            return {}
+        rows = get_db().execute(
+            f"SELECT asset_id, note FROM asset_notes WHERE asset_id IN ({','.join('?' * len(asset_ids))})",
+            asset_ids
+        ).fetchall()
+        return {row["asset_id"]: row["note"] for row in rows}
+
+    def asset_ids(self) -> List[int]:
+        """Every asset in the view, destroyed ones included."""
+        return [row["asset_id"] for row in get_db().execute("SELECT asset_id FROM assets ORDER BY asset_id")]
+
+    def lookup(self, cert_hash: str) -> Optional[int]:
+        row = get_db().execute(
+            "SELECT asset_id FROM certificates WHERE cert_hash = ?", (cert_hash.lower(),)
+        ).fetchone()
+        return row["asset_id"] if row else None
+
+    def synced_round(self) -> int:
+        row = get_db().execute("SELECT value FROM sync_state WHERE key = 'registry_round'").fetchone()
+        return row["value"] if row else 0
+
+    def sync(self) -> List[int]:
+        """
+        Apply every deployer `acfg` newer than the last synced round, following
+        `next-token` pagination, one local transaction per page. Returns the
+        IDs of assets created, reconfigured or destroyed.
+        """
+        with self._sync_lock:
+            min_round = self.synced_round() + 1
+            changed = []
+            next_page = None
+            synced_to = None
+            while True:
+                response = indexer_client.search_transactions(
+                    address=deployer_address, address_role="sender", txn_type="acfg",
+                    min_round=min_round, limit=INDEXER_PAGE_SIZE, next_page=next_page
+                )
+                # Everything up to the indexer's round at the first page is covered by this walk
+                if synced_to is None:
+                    synced_to = response.get("current-round", 0)
+                conn = get_db()
+                conn.execute("BEGIN IMMEDIATE")
                 try:
-                    mh_decoded = binascii.hexlify(base64.b64decode(mh)).decode()
-                except:
-                    mh_decoded = None
+                    for tx in response.get("transactions", []):
+                        asset_id = self.apply_transaction(tx)
+                        if asset_id:
+                            changed.append(asset_id)
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                next_page = response.get("next-token")
+                if not next_page or not response.get("transactions"):
+                    break
+
+            if synced_to:
+                get_db().execute(
+                    "INSERT INTO sync_state (key, value) VALUES ('registry_round', ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)",
+                    (synced_to,)
+                )
+            return list(dict.fromkeys(changed))
 
-                if mh_decoded == cert_hash:
-                    return {
-                        "asset_id": asset.get("index"),
-                        "params": params
-                    }
+    def sync_on_miss(self):
+        # A miss may just mean the asset was minted elsewhere since the last sync
+        now = time.time()
+        if now - self._last_miss_sync < REGISTRY_MISS_SYNC_INTERVAL:
+            return
+        self._last_miss_sync = now
+        self.sync()
 
+certificate_registry = CertificateRegistry()
+
+def resolve_certificate_hash(cert_hash: str) -> Optional[int]:
+    """
+    Map a 64-char hex SHA256 cert_hash to its asset ID via the registry.
+    """
+    cert_hash = binascii.unhexlify(cert_hash).hex()
+    asset_id = certificate_registry.lookup(cert_hash)
+    if asset_id is None:
+        certificate_registry.sync_on_miss()
+        asset_id = certificate_registry.lookup(cert_hash)
+    return asset_id
+
+def resolve_creation_note(asset_id: int, indexer=None) -> Optional[str]:
+    """
+    Return the base64 note of the asset's creation transaction ("" if it had
+    no note), or None if it cannot be found.
+
+    Checked in order: in-process cache, the local registry, then a targeted
+    indexer query for the single acfg in the asset's creation round. Indexer
+    results are written back to the registry so each note is fetched once.
+    """
+    note_b64 = creation_note_cache.get(asset_id)
+    if note_b64 is not None:
+        return note_b64
+
+    note_b64 = certificate_registry.get_note(asset_id)
+    if note_b64 is None:
+        indexer = indexer or indexer_client
+        if not indexer:
+            return None
+        asset = indexer.asset_info(asset_id, include_all=True).get("asset", {})
+        created_round = asset.get("created-at-round")
+        if not created_round:
+            return None
+        # Nothing can reconfigure an asset before it exists, so the first acfg
+        # touching it in its creation round is the creation itself.
+        response = indexer.search_asset_transactions(
+            asset_id=asset_id, txn_type="acfg", min_round=created_round, max_round=created_round, limit=1
+        )
+        creation_tx = next(
+            (tx for tx in response.get("transactions", []) if tx.get("created-asset-index") == asset_id),
+            None
+        )
+        if creation_tx is None:
+            return None
+        note_b64 = creation_tx.get("note", "")
+        certificate_registry.record_note(asset_id, note_b64, created_round)
+
+    creation_note_cache.set(asset_id, note_b64)
+    return note_b64
+
+async def registry_sync_loop():
+    """
+    Keep the registry's asset view in step with the chain: sync from the
+    indexer, then (with REGISTRY_FOLLOW_BLOCKS) long-poll algod until the
+    next round and sync again. Polls every REGISTRY_SYNC_INTERVAL otherwise,
+    or while algod cannot be reached.
+    """
+    last_round = None
+    while True:
+        try:
+            changed = await run_blocking(certificate_registry.sync)
+            certificate_registry.last_synced_round = await run_blocking(certificate_registry.synced_round)
+            if changed:
+                logging.info(f"Certificate registry applied changes to {len(changed)} assets")
+                if POAP_STATIC_DIR:
+                    await run_blocking(publish_poap_pages, changed)
+            if REGISTRY_FOLLOW_BLOCKS:
+                if last_round is None:
+                    last_round = (await async_algod.status())["last-round"]
+                last_round = (await async_algod.status_after_block(last_round))["last-round"]
+                continue
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.warning(f"Certificate registry sync failed: {e}")
+            last_round = None
+        await asyncio.sleep(REGISTRY_SYNC_INTERVAL)
+
+async def hash_upload(upload: UploadFile, spool_path: Optional[str] = None) -> str:
+    """
+    SHA-256 an upload in HASH_CHUNK_SIZE chunks, optionally spooling it to
+    `spool_path` on the way through. Only one chunk is held in memory at a time.
+    """
+    digest = hashlib.sha256()
+    spool = await run_blocking(open, spool_path, "wb") if spool_path else None
+    try:
+        while True:
+            chunk = await upload.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            if spool:
+                await run_blocking(spool.write, chunk)
+    finally:
+        if spool:
+            await run_blocking(spool.close)
+    return digest.hexdigest()
+
+# ------------------- Mint Job Queue -------------------
+class MintJobQueue:
+    """
+    Durable mint queue backed by SQLite.
+
+    Jobs are claimed under `BEGIN IMMEDIATE` with a lease, so any number of
+    worker processes sharing POAP_DB_PATH can poll it without double-claiming.
+    A running job's lease is renewed for as long as its attempt is alive, so
+    only a job whose worker died is picked up again, once its lease expires;
+    if its transaction was already submitted the new worker resumes from the
+    txid instead of minting a second asset.
+
+    Jobs may carry a unique idempotency key so a retried request finds the
+    job its first attempt created. The key also sets the transaction's
+    lease, so algod itself refuses a second mint for the same key while the
+    first transaction is still valid.
+    """
+    def __init__(self):
+        get_db().executescript("""
+            CREATE TABLE IF NOT EXISTS mint_jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                txid TEXT,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                available_at REAL NOT NULL,
+                lease_expires REAL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_mint_jobs_claim ON mint_jobs (status, available_at);
+        """)
+        columns = {row["name"] for row in get_db().execute("PRAGMA table_info(mint_jobs)")}
+        if "idempotency_key" not in columns:
+            get_db().execute("ALTER TABLE mint_jobs ADD COLUMN idempotency_key TEXT")
+        if "signed_txn" not in columns:
+            get_db().execute("ALTER TABLE mint_jobs ADD COLUMN signed_txn TEXT")
+        get_db().execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_mint_jobs_idempotency ON mint_jobs (idempotency_key) "
+            "WHERE idempotency_key IS NOT NULL"
+        )
+
+    def enqueue_once(self, job_id: str, payload: dict, file_path: str, idempotency_key: str,
+                     result: Optional[dict] = None):
+        """
+        Enqueue a job unless one with the same idempotency key exists.
+        Returns (job, created). A permanently failed job gives up its key so
+        the request can be tried again. Pass `result` to record an asset that
+        was already minted as a finished job instead of queueing a mint.
+        """
+        conn = get_db()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT * FROM mint_jobs WHERE idempotency_key = ?", (idempotency_key,)).fetchone()
+            if row is not None and row["status"] != "failed":
+                conn.execute("COMMIT")
+                return dict(row), False
+            if row is not None:
+                conn.execute("UPDATE mint_jobs SET idempotency_key = NULL WHERE id = ?", (row["id"],))
+            conn.execute(
+                "INSERT INTO mint_jobs (id, status, payload, file_path, result, idempotency_key, available_at, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, "succeeded" if result else "queued", json.dumps(payload), file_path,
+                 json.dumps(result) if result else None, idempotency_key, now, now, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(job_id), True
+
+    def claim(self, worker: str):
+        conn = get_db()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE mint_jobs SET status = 'failed', error = 'Exceeded maximum attempts', updated_at = ? "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= ?",
+                (now, now, JOB_MAX_ATTEMPTS)
+            )
+            row = conn.execute(
+                "SELECT * FROM mint_jobs "
+                "WHERE (status = 'queued' AND available_at <= ?) OR (status = 'running' AND lease_expires < ?) "
+                "ORDER BY available_at LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE mint_jobs SET status = 'running', worker = ?, attempts = attempts + 1, "
+                "lease_expires = ?, updated_at = ? WHERE id = ?",
+                (worker, now + JOB_LEASE_SECONDS, now, row["id"])
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row["id"])
+
+    def record_txid(self, job_id: str, txid: Optional[str], signed_txn: Optional[str] = None):
+        """Record the job's signed transaction (base64 msgpack) before it is sent; None clears it."""
+        get_db().execute(
+            "UPDATE mint_jobs SET txid = ?, signed_txn = ?, updated_at = ? WHERE id = ?",
+            (txid, signed_txn, time.time(), job_id)
+        )
+
+    # renew, complete and fail apply only to the attempt that claimed the job
+    # (worker and attempt number); each returns False once it was superseded
+    def renew(self, job: dict) -> bool:
+        cursor = get_db().execute(
+            "UPDATE mint_jobs SET lease_expires = ? "
+            "WHERE id = ? AND worker = ? AND attempts = ? AND status = 'running'",
+            (time.time() + JOB_LEASE_SECONDS, job["id"], job["worker"], job["attempts"])
+        )
+        return cursor.rowcount > 0
+
+    def complete(self, job: dict, result: dict) -> bool:
+        cursor = get_db().execute(
+            "UPDATE mint_jobs SET status = 'succeeded', result = ?, error = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND worker = ? AND attempts = ? AND status = 'running'",
+            (json.dumps(result), time.time(), job["id"], job["worker"], job["attempts"])
+        )
+        return cursor.rowcount > 0
+
+    def fail(self, job: dict, error: str, retry: bool) -> bool:
+        now = time.time()
+        if retry:
+            cursor = get_db().execute(
+                "UPDATE mint_jobs SET status = 'queued', error = ?, available_at = ?, lease_expires = NULL, "
+                "updated_at = ? WHERE id = ? AND worker = ? AND attempts = ? AND status = 'running'",
+                (error, now + 2 ** min(job["attempts"], 6), now, job["id"], job["worker"], job["attempts"])
+            )
+        else:
+            cursor = get_db().execute(
+                "UPDATE mint_jobs SET status = 'failed', error = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND attempts = ? AND status = 'running'",
+                (error, now, job["id"], job["worker"], job["attempts"])
+            )
+        return cursor.rowcount > 0
+
+    def get(self, job_id: str):
+        row = get_db().execute("SELECT * FROM mint_jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+mint_jobs = MintJobQueue()
+
+def build_note_data(event: str, organizer: str, date: str, recipient_name: str, recipient_email: str,
+                    certificate_hash: str, content_type: Optional[str]) -> dict:
+    return {
+        "event": clean_unicode_text(event),
+        "organizer": clean_unicode_text(organizer),
+        "date": date,
+        "recipient_name": clean_unicode_text(recipient_name),
+        "recipient_email": recipient_email,
+        "certificate_hash": certificate_hash,
+        "poap_version": f"{NOTE_VERSION}.0",
+        "type": content_type
+    }
+
+def mint_idempotency_key(certificate_hash: str, recipient_email: str, client_key: Optional[str] = None) -> str:
+    """
+    Key identifying repeats of one mint request. A client-supplied
+    Idempotency-Key is combined with the file hash, so the client can
+    deliberately mint the same file again by sending a new key: each key
+    gets its own transaction lease (see mint_lease), so the transactions differ.
+    """
+    parts = [certificate_hash]
+    if MINT_IDEMPOTENCY_SCOPE == "recipient":
+        parts.append(recipient_email.strip().lower())
+    if client_key:
+        parts.append(client_key)
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+def mint_lease(mint_key: str) -> bytes:
+    """32-byte transaction lease for a mint: one per idempotency key."""
+    return hashlib.sha256(mint_key.encode("utf-8")).digest()
+
+def find_minted_certificate(certificate_hash: str, recipient_email: str):
+    """
+    Look the file up in the certificate registry. Returns (asset_id, note_data)
+    if it was already minted within the idempotency scope, otherwise None.
+    """
+    asset_id = certificate_registry.lookup(certificate_hash)
+    if asset_id is None:
         return None
+    note = decode_note(resolve_creation_note(asset_id))
+    note_data = note if isinstance(note, dict) else None
+    if MINT_IDEMPOTENCY_SCOPE == "recipient":
+        minted_for = str((note_data or {}).get("recipient_email", "")).strip().lower()
+        if minted_for != recipient_email.strip().lower():
+            return None
+    return asset_id, note_data
+
+def poap_asset_name(event: str) -> str:
+    """The asset name of an event's POAPs. Raises ValueError if algod would reject it."""
+    name = f"POAP: {clean_unicode_text(event)}"
+    if len(name.encode("utf-8")) > MAX_ASSET_NAME_BYTES:
+        raise ValueError(
+            f"The asset name \"{name}\" takes {len(name.encode('utf-8'))} bytes on chain; "
+            f"the limit is {MAX_ASSET_NAME_BYTES}. Shorten the event name."
+        )
+    return name
+
+def poap_url(certificate_hash: str) -> str:
+    return f"https://your-domain.com/poap/{certificate_hash}"
+
+def poap_asset_params(event: str, certificate_hash: str) -> dict:
+    """The algod asset params of a POAP created by build_poap_txn, for the registry's asset view."""
+    return {
+        "creator": deployer_address,
+        "total": 1,
+        "decimals": 0,
+        "default-frozen": False,
+        "unit-name": "POAP",
+        "name": poap_asset_name(event),
+        "url": poap_url(certificate_hash),
+        "metadata-hash": base64.b64encode(binascii.unhexlify(certificate_hash)).decode(),
+        "manager": deployer_address,
+        "reserve": deployer_address,
+        "freeze": deployer_address,
+        "clawback": deployer_address,
+    }
+
+def build_poap_txn(params, event: str, certificate_hash: str, note_bytes: bytes,
+                   lease: Optional[bytes] = None) -> AssetConfigTxn:
+    return AssetConfigTxn(
+        sender=deployer_address,
+        sp=params,
+        total=1,
+        default_frozen=False,
+        unit_name="POAP",
+        asset_name=poap_asset_name(event),
+        manager=deployer_address,
+        reserve=deployer_address,
+        freeze=deployer_address,
+        clawback=deployer_address,
+        url=poap_url(certificate_hash),
+        metadata_hash=binascii.unhexlify(certificate_hash),
+        note=note_bytes,
+        lease=lease
+    )
+
+async def process_mint_job(job: dict):
+    """
+    Mint, render and email a single queued certificate.
+    """
+    payload = json.loads(job["payload"])
+    note_data = payload["note_data"]
+    certificate_hash = note_data["certificate_hash"]
 
+    # 1. Mint NFT, or resume from a transaction a previous attempt already sent
+    txid = job["txid"]
+    tx_response = None
+    try:
+        if txid:
+            # algod only answers pending-info for recent txids; the registry knows every asset we created
+            created = await run_blocking(certificate_registry.created_by, txid)
+            if created:
+                tx_response = {"asset-index": created[0], "confirmed-round": created[1]}
+        if tx_response is None and txid and job["signed_txn"]:
+            # A previous attempt may have died before its transaction reached algod
+            try:
+                await submit_signed([encoding.msgpack_decode(job["signed_txn"])], resend=True)
+            except AlgodHTTPError as e:
+                logging.warning(f"Could not resend transaction {txid}: {e}")
+        elif not txid:
+            params = await suggested_params_cache.get()
+            txn = build_poap_txn(params, note_data["event"], certificate_hash, encode_note(note_data),
+                                 mint_lease(job["idempotency_key"] or job["id"]))
+            signed_txn = txn.sign(deployer_private_key)
+            txid = signed_txn.get_txid()
+            # Recorded before sending, so a retry sends this transaction again rather than a new one
+            await run_blocking(mint_jobs.record_txid, job["id"], txid, encoding.msgpack_encode(signed_txn))
+            try:
+                await submit_signed([signed_txn])
+            except AlgodHTTPError:
+                # algod refused it, so nothing was sent; a retry builds a fresh transaction
+                await run_blocking(mint_jobs.record_txid, job["id"], None)
+                raise
+
+        if tx_response is None:
+            with stage_timer("mint", "confirmation"):
+                tx_response = await confirmation_tracker.wait(txid)
+        asset_id = tx_response["asset-index"]
+        await run_blocking(certificate_registry.record, certificate_hash, asset_id, tx_response.get("confirmed-round"),
+                           base64.b64encode(encode_note(note_data)).decode(),
+                           poap_asset_params(note_data["event"], certificate_hash), txid)
+        logging.info(f"Successfully minted NFT with asset ID: {asset_id}")
+        if POAP_STATIC_DIR:
+            await run_blocking(publish_poap_pages, [asset_id])
+    except TransactionRejectedError as e:
+        logging.error(f"Mint job {job['id']} rejected: {e}")
+        if await run_blocking(mint_jobs.fail, job, str(e), False):
+            await run_blocking(remove_temp_files, job["file_path"])
+        return
     except Exception as e:
-        logging.error(f"Error searching blockchain: {e}")
-        return None
+        retry = job["attempts"] < JOB_MAX_ATTEMPTS
+        logging.error(f"Mint job {job['id']} failed (attempt {job['attempts']}): {e}")
+        if await run_blocking(mint_jobs.fail, job, f"Failed to mint NFT on Algorand: {e}", retry) and not retry:
+            await run_blocking(remove_temp_files, job["file_path"])
+        return
+
+    # 2. Generate certificate PDF
+    with stage_timer("render", "certificate"):
+        qr_png, certificate_pdf = await render_pool.render(asset_id, note_data)
+
+    # 3. Email certificate, unless another attempt has taken the job over meanwhile
+    if not await run_blocking(mint_jobs.renew, job):
+        logging.warning(f"Mint job {job['id']} was taken over by another attempt; not emailing")
+        return
+    try:
+        email_status = await run_blocking(
+            send_certificate_email,
+            to_email=payload["recipient_email"],
+            txid=txid,
+            asset_id=asset_id,
+            qr_png=qr_png,
+            certificate=await run_blocking(read_spooled_file, job["file_path"]),
+            filename=payload["filename"],
+            certificate_pdf=certificate_pdf
+        )
+
+        if email_status:
+            logging.info(f"Email sent successfully for asset {asset_id}")
+        else:
+            logging.warning(f"Email failed for asset {asset_id}")
+
+    except Exception as e:
+        logging.error(f"Email error for asset {asset_id}: {e}")
+        email_status = False
+
+    # 4. Clean up the spooled upload
+    await run_blocking(remove_temp_files, job["file_path"])
+
+    await run_blocking(mint_jobs.complete, job, {
+        "success": True,
+        "asset_id": asset_id,
+        "transaction_id": txid,
+        "certificate_hash": certificate_hash,
+        "certificate_details": note_data,
+        "email_sent": email_status
+    })
+
+async def keep_job_lease(job: dict):
+    """Renew the job's lease every third of JOB_LEASE_SECONDS until it is cancelled or superseded."""
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+        try:
+            if not await run_blocking(mint_jobs.renew, job):
+                return
+        except sqlite3.OperationalError as e:
+            logging.warning(f"Could not renew the lease of mint job {job['id']}: {e}")
+
+async def run_mint_job(job: dict):
+    heartbeat = asyncio.create_task(keep_job_lease(job))
+    try:
+        with MINT_JOBS_IN_FLIGHT.track_in_progress():
+            await process_mint_job(job)
+    except Exception as e:
+        logging.error(f"Mint job {job['id']} crashed: {e}")
+        await run_blocking(mint_jobs.fail, job, str(e), job["attempts"] < JOB_MAX_ATTEMPTS)
+    finally:
+        heartbeat.cancel()
+
+async def mint_worker_loop(index: int):
+    """
+    Claim jobs and run up to MINT_PIPELINE_DEPTH of them at once, so the
+    next mint is submitted while earlier ones wait for their round.
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}:{index}"
+    logging.info(f"Mint worker {worker} started")
+    in_flight = asyncio.Semaphore(MINT_PIPELINE_DEPTH)
+    running = set()
+    try:
+        while True:
+            await in_flight.acquire()
+            try:
+                job = await run_blocking(mint_jobs.claim, worker)
+            except sqlite3.OperationalError as e:
+                logging.warning(f"Mint worker {worker} could not claim a job: {e}")
+                job = None
+
+            if job is None:
+                in_flight.release()
+                await asyncio.sleep(JOB_POLL_INTERVAL)
+                continue
+
+            task = asyncio.create_task(run_mint_job(job))
+            running.add(task)
+            task.add_done_callback(running.discard)
+            task.add_done_callback(lambda _: in_flight.release())
+    finally:
+        # Unfinished jobs are picked up again when their lease expires
+        for task in running:
+            task.cancel()
+
+# ------------------- Batch Minting -------------------
+def parse_roster(data: bytes, filename: str) -> List[dict]:
+    """
+    Parse a CSV or JSON roster into rows with recipient_name, recipient_email and file.
+    """
+    text = data.decode("utf-8-sig")
+    if filename.lower().endswith(".json") or text.lstrip().startswith("["):
+        rows = json.loads(text)
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("JSON roster must be a list of objects")
+    else:
+        rows = list(csv.DictReader(io.StringIO(text)))
+
+    roster = []
+    for i, row in enumerate(rows, start=1):
+        missing = [key for key in ("recipient_name", "recipient_email", "file") if not row.get(key)]
+        if missing:
+            raise ValueError(f"Roster row {i} is missing {', '.join(missing)}")
+        roster.append({key: str(row[key]).strip() for key in ("recipient_name", "recipient_email", "file")})
+    return roster
+
+def hash_zip_member(zip_path: str, name: str) -> str:
+    # Each call opens its own ZipFile so members can be inflated and hashed in parallel threads
+    with zipfile.ZipFile(zip_path) as archive, archive.open(name) as member:
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: member.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_zip_member(zip_path: str, name: str) -> bytes:
+    with zipfile.ZipFile(zip_path) as archive:
+        return archive.read(name)
+
+async def submit_poap_group(params, entries: List[dict]) -> List[str]:
+    """
+    Sign and submit one atomic group of POAP mints. Returns the txids in group order.
+    """
+    txns = [
+        build_poap_txn(params, entry["note_data"]["event"], entry["certificate_hash"],
+                       encode_note(entry["note_data"]))
+        for entry in entries
+    ]
+    assign_group_id(txns)
+    return await submit_signed([txn.sign(deployer_private_key) for txn in txns])
+
+async def confirm_poap_group(txids: List[str]) -> List[dict]:
+    """
+    Wait for a submitted group and return each transaction's confirmation info in group order.
+    """
+    with stage_timer("mint", "confirmation"):
+        return await confirmation_tracker.wait_group(txids)
+
+async def email_batch_entry(entry: dict, rendered: tuple, zip_path: str) -> bool:
+    qr_png, certificate_pdf = rendered
+    try:
+        return await run_blocking(
+            send_certificate_email,
+            to_email=entry["recipient_email"],
+            txid=entry["transaction_id"],
+            asset_id=entry["asset_id"],
+            qr_png=qr_png,
+            certificate=await run_blocking(read_zip_member, zip_path, entry["file"]),
+            filename=os.path.basename(entry["file"]),
+            certificate_pdf=certificate_pdf
+        )
+    except Exception as e:
+        logging.error(f"Email error for asset {entry['asset_id']}: {e}")
+        return False
+
+# ------------------- Certificate Export -------------------
+EXPORT_FIELDS = [
+    "asset_id", "asset_name", "created_round", "deleted", "certificate_hash", "event", "organizer",
+    "date", "recipient_name", "recipient_email", "url"
+]
+
+def fetch_asset_page(next_page: Optional[str] = None) -> dict:
+    return indexer_client.search_assets(
+        creator=deployer_address, limit=INDEXER_PAGE_SIZE, next_page=next_page, include_all=True
+    )
+
+def certificate_export_row(asset: dict, note) -> dict:
+    params = asset.get("params", {})
+    note_data = note if isinstance(note, dict) else {}
+    metadata_hash = params.get("metadata-hash")
+    return {
+        "asset_id": asset.get("index"),
+        "asset_name": params.get("name"),
+        "created_round": asset.get("created-at-round"),
+        "deleted": asset.get("deleted", False),
+        "certificate_hash": base64.b64decode(metadata_hash).hex() if metadata_hash else None,
+        "event": note_data.get("event"),
+        "organizer": note_data.get("organizer"),
+        "date": note_data.get("date"),
+        "recipient_name": note_data.get("recipient_name"),
+        "recipient_email": note_data.get("recipient_email"),
+        "url": params.get("url")
+    }
+
+def export_row_matches(row: dict, event: Optional[str] = None, organizer: Optional[str] = None,
+                       date_from: Optional[str] = None, date_to: Optional[str] = None) -> bool:
+    # Event and organizer match case-insensitively as substrings; dates are ISO strings, inclusive
+    if event and event.lower() not in str(row["event"] or "").lower():
+        return False
+    if organizer and organizer.lower() not in str(row["organizer"] or "").lower():
+        return False
+    if date_from and (not row["date"] or str(row["date"]) < date_from):
+        return False
+    if date_to and (not row["date"] or str(row["date"]) > date_to):
+        return False
+    return True
+
+async def iter_issued_certificates(event: Optional[str] = None, organizer: Optional[str] = None,
+                                   date_from: Optional[str] = None, date_to: Optional[str] = None):
+    """
+    Yield an export row for every asset the deployer created, following the
+    indexer's `next-token` pagination. The next page is fetched while the
+    current one is joined with its creation notes, and no more than two pages
+    are held at a time, so memory stays flat however many certificates exist.
+    """
+    note_slots = asyncio.Semaphore(EXPORT_NOTE_CONCURRENCY)
+
+    async def resolve_note(asset_id: int):
+        async with note_slots:
+            return await run_blocking(resolve_creation_note, asset_id)
+
+    pending = asyncio.ensure_future(run_blocking(fetch_asset_page))
+    try:
+        while pending is not None:
+            response = await pending
+            assets = response.get("assets", [])
+            next_page = response.get("next-token")
+            pending = asyncio.ensure_future(run_blocking(fetch_asset_page, next_page)) if next_page and assets else None
+
+            # Notes come from the registry in one query; only unsynced assets go to the indexer
+            notes = await run_blocking(certificate_registry.get_notes, [asset["index"] for asset in assets])
+            missing = [asset["index"] for asset in assets if asset["index"] not in notes]
+            for asset_id, note_b64 in zip(missing, await asyncio.gather(*(resolve_note(a) for a in missing))):
+                notes[asset_id] = note_b64
+
+            for asset in assets:
+                row = certificate_export_row(asset, decode_note(notes.get(asset["index"])))
+                if export_row_matches(row, event, organizer, date_from, date_to):
+                    yield row
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+def format_export_row(row: dict, fmt: str) -> str:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS).writerow(row)
+        return buffer.getvalue()
+    return json.dumps(row) + "\n"
+
+async def stream_certificate_export(fmt: str, **filters):
+    if fmt == "csv":
+        yield ",".join(EXPORT_FIELDS) + "\r\n"
+    async for row in iter_issued_certificates(**filters):
+        yield format_export_row(row, fmt)
 
 # ------------------- API Routes -------------------
 
 # Root
 @app.get("/")
 async def root():
-    return {"message": "Unified Algorand POAP API. Endpoints: /mint, /verify, /verify-multiple, /get-certificate"}
+    return {"message": "Unified Algorand POAP API. Endpoints: /mint, /mint-batch, /jobs/{job_id}, /verify, /verify/{asset_id}, /verify-file, /verify-multiple, /get-certificate, /certificate/{asset_id}, /poap/{certificate_hash}"}
 
 @app.post("/mint")
 async def mint_nft(
@@ -458,152 +2300,457 @@ async def mint_nft(
     date: str = Form(...),
     recipient_name: str = Form(...),
     recipient_email: str = Form(...),
-    certificate_file: UploadFile = File(...)
+    certificate_file: UploadFile = File(...),
+    idempotency_key: Optional[str] = Header(None)
 ):
     """
-    Mints a new Algorand NFT for a certificate.
+    Queues a new Algorand NFT mint for a certificate.
     - Takes certificate details and the file itself.
     - Hashes the file on the server.
-    - Mints a new NFT with the hash and details.
-    - Emails the recipient the generated PDF, QR code, and the original file.
+    - Returns 202 with a job ID; poll /jobs/{job_id} for the result.
+    - A mint worker then mints the NFT and emails the recipient the generated
+      PDF, QR code, and the original file.
+    - Repeats of a request (same file and recipient, or the same
+      Idempotency-Key header) return 200 with the original job, or with the
+      asset already minted for the file, instead of minting again.
     """
-    logging.info(f"Minting certificate for {recipient_name} ({recipient_email})")
+    require_signing_key()
+    logging.info(f"Queueing certificate mint for {recipient_name} ({recipient_email})")
     
-    # 1. Read file and calculate hash
-    contents = await certificate_file.read()
-    certificate_hash = hashlib.sha256(contents).hexdigest()
+    # 1. Spool the upload under a new job ID, hashing it as it streams
+    job_id = uuid.uuid4().hex
+    job_file_path = os.path.join(JOBS_FOLDER, job_id)
+    certificate_hash = await hash_upload(certificate_file, job_file_path)
     
-    # 2. Prepare metadata and mint NFT
-    note_data = {
-        "event": clean_unicode_text(event),
-        "organizer": clean_unicode_text(organizer),
-        "date": date,
-        "recipient_name": clean_unicode_text(recipient_name),
+    # 2. Prepare metadata, refusing details too long for the asset name or transaction note
+    note_data = build_note_data(event, organizer, date, recipient_name, recipient_email,
+                                certificate_hash, certificate_file.content_type)
+    try:
+        poap_asset_name(event)
+        encode_note(note_data)
+    except ValueError as e:
+        await run_blocking(remove_temp_files, job_file_path)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # 3. Enqueue, unless this request (or the file itself) was already handled
+    mint_key = mint_idempotency_key(certificate_hash, recipient_email, idempotency_key)
+    result = None
+    if not idempotency_key:
+        minted = await run_blocking(find_minted_certificate, certificate_hash, recipient_email)
+        if minted:
+            asset_id, minted_note = minted
+            result = {
+                "success": True,
+                "asset_id": asset_id,
+                "transaction_id": None,
+                "certificate_hash": certificate_hash,
+                "certificate_details": minted_note or note_data,
+                "email_sent": False
+            }
+    job, created = await run_blocking(mint_jobs.enqueue_once, job_id, {
+        "note_data": note_data,
         "recipient_email": recipient_email,
+        "filename": os.path.basename(certificate_file.filename or "certificate")
+    }, job_file_path, mint_key, result)
+
+    duplicate = not created or result is not None
+    if duplicate:
+        logging.info(f"Duplicate mint request for {certificate_hash}; returning job {job['id']}")
+        await run_blocking(remove_temp_files, job_file_path)
+
+    return JSONResponse(status_code=200 if duplicate else 202, content={
+        "success": True,
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"/jobs/{job['id']}",
         "certificate_hash": certificate_hash,
-        "poap_version": "1.0",
-        "type": certificate_file.content_type
+        "duplicate": duplicate
+    })
+
+# Mint job status
+@app.get("/jobs/{job_id}")
+def get_mint_job(job_id: str):
+    job = mint_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "transaction_id": job["txid"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "result": json.loads(job["result"]) if job["result"] else None,
+        "error": job["error"]
     }
-    note_bytes = json.dumps(note_data).encode("utf-8")
 
+# Batch mint
+@app.post("/mint-batch")
+async def mint_batch(
+    http_request: Request,
+    event: str = Form(...),
+    organizer: str = Form(...),
+    date: str = Form(...),
+    roster: UploadFile = File(...),
+    certificates: UploadFile = File(...),
+    send_emails: bool = Form(True)
+):
+    """
+    Mints one POAP per roster row in atomic groups of up to 16 transactions.
+    - `roster` is CSV or JSON with recipient_name, recipient_email and file columns.
+    - `certificates` is a zip whose member names match the roster's file column.
+    - All groups share the cached suggested params, are submitted back to back,
+      and are confirmed together by the confirmation tracker.
+    - At most MINT_BATCH_MAX_ROWS rows; each counts against the client's mint rate limit.
+    Returns a map of recipient email to asset ID and transaction ID.
+    """
+    require_signing_key()
     try:
-        # Build transaction
-        params = algod_client.suggested_params()
-        
-        txn = AssetConfigTxn(
-            sender=deployer_address,
-            sp=params,
-            total=1,
-            default_frozen=False,
-            unit_name="POAP",
-            asset_name=f"POAP: {clean_unicode_text(event)}",
-            manager=deployer_address,
-            reserve=deployer_address,
-            freeze=deployer_address,
-            clawback=deployer_address,
-            url=f"https://your-domain.com/poap/{certificate_hash}",
-            metadata_hash=binascii.unhexlify(certificate_hash),
-            note=note_bytes
-        )
+        poap_asset_name(event)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        rows = parse_roster(await roster.read(), roster.filename or "")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch upload: {e}")
+    if len(rows) > MINT_BATCH_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {MINT_BATCH_MAX_ROWS} roster rows per batch")
+    admit(http_request, mint_limiter, len(rows))
+    # Spool the zip to disk rather than holding up to MAX_UPLOAD_BYTES in memory
+    zip_path = os.path.join(JOBS_FOLDER, f"batch-{uuid.uuid4().hex}.zip")
+    try:
+        await hash_upload(certificates, zip_path)
+        return await mint_batch_from_zip(event, organizer, date, rows, zip_path, send_emails)
+    finally:
+        await run_blocking(remove_temp_files, zip_path)
 
-        signed_txn = txn.sign(deployer_private_key)
-        txid = algod_client.send_transaction(signed_txn)
-        
-        wait_for_confirmation(algod_client, txid)
-        
-        # Get asset ID
-        tx_response = algod_client.pending_transaction_info(txid)
-        asset_id = tx_response["asset-index"]
-        
-        logging.info(f"Successfully minted NFT with asset ID: {asset_id}")
-        
+async def mint_batch_from_zip(event: str, organizer: str, date: str, rows: List[dict], zip_path: str,
+                              send_emails: bool) -> dict:
+    try:
+        with zipfile.ZipFile(zip_path) as archive:
+            members = set(archive.namelist())
+    except (ValueError, zipfile.BadZipFile) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch upload: {e}")
+
+    emails = [row["recipient_email"] for row in rows]
+    if len(set(emails)) != len(emails):
+        raise HTTPException(status_code=400, detail="Roster contains duplicate recipient emails")
+
+    logging.info(f"Batch minting {len(rows)} certificates for {event}")
+    results = {}
+    entries = []
+    for row in rows:
+        if row["file"] not in members:
+            results[row["recipient_email"]] = {"success": False, "error": f"File not found in zip: {row['file']}"}
+        else:
+            entries.append(dict(row))
+
+    # 1. Hash certificate files in parallel
+    hashes = await asyncio.gather(*(run_blocking(hash_zip_member, zip_path, entry["file"]) for entry in entries))
+    noted = []
+    for entry, certificate_hash in zip(entries, hashes):
+        entry["certificate_hash"] = certificate_hash
+        entry["note_data"] = build_note_data(event, organizer, date, entry["recipient_name"],
+                                             entry["recipient_email"], certificate_hash,
+                                             guess_type(entry["file"])[0])
+        try:
+            encode_note(entry["note_data"])
+            noted.append(entry)
+        except NoteTooLargeError as e:
+            results[entry["recipient_email"]] = {"success": False, "error": str(e)}
+    entries = noted
+
+    # 2. Submit every group against one shared set of suggested params
+    groups = [entries[i:i + MAX_GROUP_SIZE] for i in range(0, len(entries), MAX_GROUP_SIZE)]
+    try:
+        params = await suggested_params_cache.get() if groups else None
     except Exception as e:
-        logging.error(f"Failed to mint NFT: {e}")
-        raise HTTPException(status_code=500, detail=f"❌ Failed to mint NFT on Algorand: {e}")
+        raise HTTPException(status_code=502, detail=f"❌ Failed to fetch suggested params: {e}")
+    submissions = await asyncio.gather(*(submit_poap_group(params, group) for group in groups), return_exceptions=True)
 
-    # 3. Save the uploaded file temporarily to attach to the email
-    temp_cert_path = os.path.join(TEMP_FOLDER, certificate_file.filename)
-    with open(temp_cert_path, "wb") as f:
-        f.write(contents)
+    # 3. Wait for all submitted groups concurrently
+    async def confirm(submission):
+        if isinstance(submission, Exception):
+            return submission
+        try:
+            return await confirm_poap_group(submission)
+        except Exception as e:
+            return e
+    confirmations = await asyncio.gather(*(confirm(submission) for submission in submissions))
+
+    minted = []
+    for group, submission, confirmation in zip(groups, submissions, confirmations):
+        if isinstance(confirmation, Exception):
+            logging.error(f"Failed to mint batch group: {confirmation}")
+            for entry in group:
+                results[entry["recipient_email"]] = {"success": False, "error": f"Failed to mint NFT on Algorand: {confirmation}"}
+            continue
+        for entry, txid, tx_info in zip(group, submission, confirmation):
+            entry["transaction_id"] = txid
+            entry["asset_id"] = tx_info["asset-index"]
+            entry["confirmed_round"] = tx_info.get("confirmed-round")
+            minted.append(entry)
+    await run_blocking(certificate_registry.record_many, [
+        (entry["certificate_hash"], entry["asset_id"], entry["confirmed_round"],
+         base64.b64encode(encode_note(entry["note_data"])).decode(),
+         poap_asset_params(event, entry["certificate_hash"]), entry["transaction_id"])
+        for entry in minted
+    ])
+    if POAP_STATIC_DIR:
+        await run_blocking(publish_poap_pages, [entry["asset_id"] for entry in minted])
+
+    # 4. Render certificates on the render pool and email recipients
+    email_statuses = []
+    if send_emails:
+        with stage_timer("render", "certificate_batch"):
+            rendered = await render_pool.render_many([(entry["asset_id"], entry["note_data"]) for entry in minted])
+        email_statuses = await asyncio.gather(*(
+            email_batch_entry(entry, rendered_entry, zip_path) for entry, rendered_entry in zip(minted, rendered)
+        ))
+    for i, entry in enumerate(minted):
+        results[entry["recipient_email"]] = {
+            "success": True,
+            "asset_id": entry["asset_id"],
+            "transaction_id": entry["transaction_id"],
+            "certificate_hash": entry["certificate_hash"],
+            "email_sent": email_statuses[i] if send_emails else False
+        }
 
-    # 4. Generate certificate PDF
-    qr_path = generate_certificate_pdf(asset_id, note_data)
+    logging.info(f"Batch minted {len(minted)}/{len(rows)} certificates in {len(groups)} groups")
+    return {
+        "success": len(minted) == len(rows),
+        "minted": len(minted),
+        "failed": len(rows) - len(minted),
+        "groups": len(groups),
+        "recipients": results
+    }
 
-    # 5. Email certificate
+# Verify a certificate file against the chain
+@app.post("/verify-file")
+async def verify_certificate_file(certificate_file: UploadFile = File(...)):
+    """
+    Hashes an uploaded certificate and verifies the POAP minted for it, if any.
+    """
+    certificate_hash = await hash_upload(certificate_file)
     try:
-        email_status = send_certificate_email(
-            to_email=recipient_email,
-            txid=txid,
-            asset_id=asset_id,
-            qr_path=qr_path,
-            certificate_path=temp_cert_path
-        )
-        
-        if email_status:
-            logging.info(f"Email sent successfully for asset {asset_id}")
-        else:
-            logging.warning(f"Email failed for asset {asset_id}")
-            
+        asset_id = await run_blocking(resolve_certificate_hash, certificate_hash)
     except Exception as e:
-        logging.error(f"Email error for asset {asset_id}: {e}")
-        email_status = False
-    
-    # 6. Clean up temporary files
+        logging.error(f"Error resolving certificate hash {certificate_hash}: {e}")
+        raise HTTPException(status_code=502, detail=f"Failed to look up certificate: {e}")
+
+    if asset_id is None:
+        return {"found": False, "certificate_hash": certificate_hash}
+
+    verifier = POAPVerifier(algod_client, indexer_client)
     try:
-        if os.path.exists(temp_cert_path):
-            os.remove(temp_cert_path)
-        if os.path.exists(qr_path):
-            os.remove(qr_path)
+        verification = verifier.verify_snapshot(await load_asset_snapshot(asset_id))
     except Exception as e:
-        logging.warning(f"Failed to clean up temporary files: {e}")
-
+        logging.error(f"Error verifying POAP {asset_id}: {e}")
+        verification = {"asset_id": asset_id, "error": str(e)}
     return {
-        "success": True,
-        "asset_id": asset_id,
-        "transaction_id": txid,
+        "found": True,
         "certificate_hash": certificate_hash,
-        "certificate_details": note_data,
-        "email_sent": email_status
+        "asset_id": asset_id,
+        "verification": verification
     }
 
 # Verify single POAP
 @app.post("/verify")
-def verify_poap(request: VerifyRequest):
+async def verify_poap(request: VerifyRequest):
     verifier = POAPVerifier(algod_client, indexer_client)
     try:
-        result = verifier.comprehensive_verification(request.asset_id)
+        result = verifier.verify_snapshot(await load_asset_snapshot(request.asset_id))
         return result
     except Exception as e:
         logging.error(f"Error verifying POAP {request.asset_id}: {e}")
         return {"asset_id": request.asset_id, "error": str(e)}
 
+@app.get("/verify/{asset_id}")
+async def verify_poap_cacheable(asset_id: int, request: Request):
+    """
+    GET form of /verify for browsers and CDNs. Responses carry a strong ETag
+    and Cache-Control for HTTP_CACHE_MAX_AGE with must-revalidate;
+    If-None-Match gets 304 when unchanged. The registry round is sent as
+    X-Synced-Round instead of in the body.
+    """
+    verifier = POAPVerifier(algod_client, indexer_client)
+    snapshot = await load_asset_snapshot_or_error(asset_id)
+    return cacheable_response(request, snapshot, lambda snap: without_synced_round(verifier.verify_snapshot(snap)))
+
 # Verify multiple POAPs
 @app.post("/verify-multiple")
-def verify_multiple_poaps(asset_ids: List[int]):
+async def verify_multiple_poaps(http_request: Request, asset_ids: List[int], stream: bool = False,
+                                concurrency: Optional[int] = None):
+    """
+    Verifies many POAPs concurrently. Repeated IDs are verified once.
+    - At most VERIFY_MAX_BATCH IDs per request; each unique ID counts
+      against the client's read rate limit.
+    - `concurrency` caps in-flight verifications (defaults to VERIFY_CONCURRENCY).
+    - `stream=true` returns NDJSON, one line per asset as soon as it finishes.
+    A failure for one ID is reported in its own result and never fails the batch.
+    """
+    if len(asset_ids) > VERIFY_MAX_BATCH:
+        raise HTTPException(status_code=413, detail=f"At most {VERIFY_MAX_BATCH} asset IDs per request")
     verifier = POAPVerifier(algod_client, indexer_client)
-    results = []
-    for aid in asset_ids:
-        try:
-            result = verifier.comprehensive_verification(aid)
-            results.append(result)
-        except Exception as e:
-            logging.error(f"Error verifying POAP {aid}: {e}")
-            results.append({"asset_id": aid, "error": str(e)})
-    return results
+    unique_ids = list(dict.fromkeys(asset_ids))
+    admit(http_request, read_limiter, len(unique_ids))
+    limit = asyncio.Semaphore(max(1, min(concurrency or VERIFY_CONCURRENCY, VERIFY_MAX_CONCURRENCY)))
+
+    async def verify_one(aid):
+        async with limit:
+            try:
+                return verifier.verify_snapshot(await load_asset_snapshot(aid))
+            except Exception as e:
+                logging.error(f"Error verifying POAP {aid}: {e}")
+                return {"asset_id": aid, "error": str(e)}
+
+    if stream:
+        async def ndjson_results():
+            tasks = [asyncio.ensure_future(verify_one(aid)) for aid in unique_ids]
+            try:
+                for next_result in asyncio.as_completed(tasks):
+                    yield json.dumps(await next_result) + "\n"
+            finally:
+                for task in tasks:
+                    task.cancel()
+        return StreamingResponse(ndjson_results(), media_type="application/x-ndjson")
+
+    return await asyncio.gather(*(verify_one(aid) for aid in unique_ids))
 
 # Get certificate details from on-chain data
 @app.post("/get-certificate")
-def get_certificate(request: AssetRequest):
-    result = get_certificate_details_from_asset_id(request.asset_id)
-    if not result["success"]:
-        raise HTTPException(status_code=404, detail=result["error"])
+async def get_certificate(request: AssetRequest):
+    try:
+        result = certificate_details_from_snapshot(await load_asset_snapshot(request.asset_id))
+    except AlgodHTTPError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UpstreamUnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=404, detail=f"Unexpected error: {e}")
     return result
 
+async def load_asset_snapshot_or_error(asset_id: int) -> AssetSnapshot:
+    # Errors are raised as statuses so that no cache stores them as a 200
+    try:
+        return await load_asset_snapshot(asset_id)
+    except AlgodHTTPError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UpstreamUnavailableError:
+        raise
+    except Exception as e:
+        logging.error(f"Error loading asset {asset_id}: {e}")
+        raise HTTPException(status_code=502, detail=f"Failed to load asset: {e}")
+
+# Verification and certificate details from a single snapshot
+@app.get("/certificate/{asset_id}")
+async def get_certificate_with_verification(asset_id: int, request: Request):
+    """
+    Combined /verify + /get-certificate response, built from one set of upstream calls.
+    Cacheable: see /verify/{asset_id}.
+    """
+    snapshot = await load_asset_snapshot_or_error(asset_id)
+    return cacheable_response(request, snapshot, poap_page)
+
+# Public page for a certificate, at the URL written into its asset
+@app.get("/poap/{certificate_hash}")
+async def get_poap_page(certificate_hash: str, request: Request):
+    """
+    The /certificate/{asset_id} response for the asset holding `certificate_hash`.
+    With POAP_STATIC_DIR set the same page is also written as a static file
+    whenever the asset changes, so a web server or CDN can serve this path
+    without reaching the API.
+    """
+    try:
+        if len(bytes.fromhex(certificate_hash)) != 32:
+            raise ValueError(certificate_hash)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Not a certificate hash")
+    asset_id = await run_blocking(resolve_certificate_hash, certificate_hash)
+    if asset_id is None:
+        raise HTTPException(status_code=404, detail="Certificate not found on chain")
+    snapshot = await load_asset_snapshot_or_error(asset_id)
+    return cacheable_response(request, snapshot, poap_page)
+
+# Export every issued certificate
+@app.get("/certificates")
+async def export_certificates(
+    format: str = "ndjson",
+    event: Optional[str] = None,
+    organizer: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None
+):
+    """
+    Streams every POAP the deployer has minted, joined with its creation
+    note, as NDJSON (default) or CSV. Filter by event or organizer
+    (case-insensitive substring) and by event date (YYYY-MM-DD, inclusive).
+    """
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": "attachment; filename=certificates.csv"} if format == "csv" else {}
+    return StreamingResponse(
+        stream_certificate_export(format, event=event, organizer=organizer, date_from=date_from, date_to=date_to),
+        media_type=media_type, headers=headers
+    )
+
+# Prometheus metrics
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus text exposition: per-stage latency histograms (algod, indexer,
+    render, email, mint confirmation), upstream error counters, cache hit
+    counters and in-flight gauges.
+    """
+    return PlainTextResponse(await run_blocking(REGISTRY.expose), media_type="text/plain; version=0.0.4")
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
     return {
         "status": "healthy",
+        "mode": "verify-only" if VERIFY_ONLY else "full",
         "deployer_address": deployer_address,
-        "gmail_configured": bool(GMAIL_USER and GMAIL_PASS)
+        "gmail_configured": email_configured(),
+        "caches": cache_stats(),
+        "synced_round": certificate_registry.last_synced_round,
+        "upstreams": {"algod": algod_transport.state(), "indexer": indexer_transport.state()}
     }
+
+# ------------------- Command Line -------------------
+async def export_certificates_to(output, fmt: str, **filters) -> int:
+    count = 0
+    async for chunk in stream_certificate_export(fmt, **filters):
+        output.write(chunk)
+        count += 1
+    return count - (1 if fmt == "csv" else 0)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="POAP minting service utilities")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="export every issued certificate")
+    export_parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    export_parser.add_argument("--output", help="file to write (default: stdout)")
+    export_parser.add_argument("--event")
+    export_parser.add_argument("--organizer")
+    export_parser.add_argument("--date-from", help="YYYY-MM-DD, inclusive")
+    export_parser.add_argument("--date-to", help="YYYY-MM-DD, inclusive")
+    commands.add_parser("publish-pages", help="sync the registry and rewrite every static page in POAP_STATIC_DIR")
+    args = parser.parse_args()
+
+    if args.command == "publish-pages":
+        if not POAP_STATIC_DIR:
+            parser.error("POAP_STATIC_DIR is not set")
+        certificate_registry.sync()
+        asset_ids = certificate_registry.asset_ids()
+        publish_poap_pages(asset_ids)
+        logging.info(f"Published static pages for {len(asset_ids)} assets to {POAP_STATIC_DIR}")
+        sys.exit(0)
+
+    with (open(args.output, "w", newline="", encoding="utf-8") if args.output else nullcontext(sys.stdout)) as output:
+        exported = asyncio.run(export_certificates_to(
+            output, args.format, event=args.event, organizer=args.organizer,
+            date_from=args.date_from, date_to=args.date_to
+        ))
+    logging.info(f"Exported {exported} certificates")
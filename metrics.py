@@ -0,0 +1,210 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+# Minimal Prometheus text-format metrics (counters, gauges, histograms) and
+# the per-request stage timings behind the Server-Timing header.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label_value(value)}"' for name, value in labels.items()) + "}"
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Registry:
+    """Metrics and scrape-time collectors rendered together by `expose`."""
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def register_collector(self, collector: Callable[[], List[str]]):
+        """`collector` returns ready-made exposition lines, computed when scraped."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def expose(self) -> str:
+        with self._lock:
+            metrics, collectors = list(self._metrics), list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.expose())
+        for collector in collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple) -> dict:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self):
+        with self._lock:
+            return [("", self._labels(key), value) for key, value in self._values.items()]
+
+    def expose(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{format_labels(labels)} {format_value(value)}")
+        return lines
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_in_progress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS,
+                 registry: Registry = REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                labels = self._labels(key)
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    samples.append(("_bucket", {**labels, "le": format_value(bound)}, cumulative))
+                samples.append(("_sum", labels, total))
+                samples.append(("_count", labels, count))
+        return samples
+
+# ------------------- Stage Timing -------------------
+STAGE_SECONDS = Histogram(
+    "poap_stage_duration_seconds", "Time spent per upstream call or processing stage", ("stage", "operation")
+)
+STAGE_ERRORS = Counter(
+    "poap_stage_errors_total", "Upstream calls or processing stages that raised", ("stage", "operation")
+)
+STAGE_IN_FLIGHT = Gauge("poap_stage_in_flight", "Calls currently running per stage", ("stage",))
+
+# (stage, seconds) entries for the current request, or None outside one
+request_timings: contextvars.ContextVar = contextvars.ContextVar("request_timings", default=None)
+
+@contextmanager
+def stage_timer(stage: str, operation: str):
+    """
+    Time a block as one `stage`/`operation` call: observed in the stage
+    histogram, counted as an error if it raises, and added to the current
+    request's Server-Timing entries.
+    """
+    STAGE_IN_FLIGHT.inc(stage=stage)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage, operation=operation)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_IN_FLIGHT.dec(stage=stage)
+        STAGE_SECONDS.observe(elapsed, stage=stage, operation=operation)
+        timings = request_timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed))
+
+def server_timing_header(timings: list, total: Optional[float] = None) -> str:
+    """Sum a request's stage timings into a Server-Timing header value (milliseconds)."""
+    per_stage = {}
+    for stage, elapsed in timings:
+        duration, calls = per_stage.get(stage, (0.0, 0))
+        per_stage[stage] = (duration + elapsed, calls + 1)
+    entries = [
+        f'{stage};dur={duration * 1000:.1f};desc="{calls} call{"s" if calls != 1 else ""}"'
+        for stage, (duration, calls) in per_stage.items()
+    ]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+class TimedClient:
+    """
+    Proxy that times every method call on a blocking algod/indexer client
+    under `stage`, labelled with the method name.
+    """
+    def __init__(self, client, stage: str):
+        self.client = client
+        self.stage = stage
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            with stage_timer(self.stage, name):
+                return attr(*args, **kwargs)
+        return call
@@ -0,0 +1,77 @@
+import json
+from typing import Optional, Union
+
+import msgpack
+
+# POAP creation-note codec: encodes the note written at mint, decodes any version.
+#
+# Version 1 notes are the original JSON object with long keys. Version 2
+# notes follow ARC-2 ("<dapp>:<format><data>") as "poap:m" plus a msgpack map
+# with one-letter keys. The certificate hash is left out because it is
+# already the asset's metadata-hash.
+
+NOTE_PREFIX = b"poap:m"
+NOTE_VERSION = 2
+# Algorand rejects transactions whose note is longer than this
+MAX_NOTE_BYTES = 1024
+
+# Long field name -> short key, per note version
+SHORT_KEYS = {
+    2: {
+        "event": "e",
+        "organizer": "o",
+        "date": "d",
+        "recipient_name": "n",
+        "recipient_email": "m",
+        "type": "t",
+    },
+}
+LONG_KEYS = {version: {short: long for long, short in keys.items()} for version, keys in SHORT_KEYS.items()}
+
+class NoteTooLargeError(ValueError):
+    pass
+
+def encode_note(note_data: dict) -> bytes:
+    """
+    Pack note fields (long names, as built for a mint) into a version 2
+    note. Fields the version has no key for, and empty ones, are dropped.
+    """
+    keys = SHORT_KEYS[NOTE_VERSION]
+    fields = {"v": NOTE_VERSION}
+    fields.update((keys[name], value) for name, value in note_data.items() if name in keys and value is not None)
+    note = NOTE_PREFIX + msgpack.packb(fields, use_bin_type=True)
+    if len(note) > MAX_NOTE_BYTES:
+        raise NoteTooLargeError(
+            f"Certificate details take {len(note)} bytes on chain; the limit is {MAX_NOTE_BYTES}. "
+            f"Shorten the event, organizer or recipient name."
+        )
+    return note
+
+def decode_note(note: bytes) -> Union[dict, str, None]:
+    """
+    Decode a creation note of any version: a dict with long field names for
+    POAP notes (version 1 JSON or version 2 msgpack), the raw text for
+    anything else, None if empty.
+    """
+    if not note:
+        return None
+    if note.startswith(NOTE_PREFIX):
+        fields = _unpack(note[len(NOTE_PREFIX):])
+        if fields is not None:
+            keys = LONG_KEYS.get(fields.get("v"), {})
+            decoded = {keys.get(short, short): value for short, value in fields.items() if short != "v"}
+            decoded["poap_version"] = f"{fields.get('v')}.0"
+            return decoded
+    else:
+        try:
+            return json.loads(note)
+        except ValueError:
+            pass
+    return note.decode("utf-8", errors="ignore")
+
+def _unpack(data: bytes) -> Optional[dict]:
+    try:
+        fields = msgpack.unpackb(data, raw=False)
+    except (ValueError, TypeError):
+        return None
+    return fields if isinstance(fields, dict) else None
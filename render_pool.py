@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List
+
+# The pool lives apart from rendering.py so the API process can schedule
+# renders without importing reportlab, PIL or qrcode itself; only the
+# worker processes load them.
+
+def _init_worker():
+    from rendering import get_certificate_template
+    get_certificate_template()
+
+def _render_batch(chunk: List[tuple]) -> List[tuple]:
+    from rendering import render_batch
+    return render_batch(chunk)
+
+class RenderPool:
+    """
+    Renders QR codes and certificate PDFs on a pool of worker processes so
+    CPU-bound drawing never competes with request handling for the GIL.
+
+    Work is sent in batches of `batch_size` to amortize pickling and IPC. At
+    most `max_pending` batches are queued or running at once; further callers
+    wait for a slot, which pushes backpressure up to whoever is producing
+    render work instead of growing an unbounded queue.
+    """
+    def __init__(self, processes: int, max_pending: int, batch_size: int):
+        self.processes = processes
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self._executor = None
+        self._slots = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: workers import only rendering.py, never the API process's threads or sockets
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+        return self._executor
+
+    async def start(self):
+        """Spawn every worker process and build its template ahead of the first render."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(self.processes)))
+
+    async def _render_chunk(self, chunk: List[tuple]) -> List[tuple]:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(self._get_executor(), _render_batch, chunk)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); start a fresh pool for the next batch
+                self._executor = None
+                raise
+
+    async def render_many(self, items: List[tuple]) -> List[tuple]:
+        """
+        Render (asset_id, details) pairs; returns (qr_png, certificate_pdf) in
+        input order, with (None, None) for any batch that failed.
+        """
+        chunks = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        results = await asyncio.gather(*(self._render_chunk(chunk) for chunk in chunks), return_exceptions=True)
+        rendered = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                logging.error(f"Render batch of {len(chunk)} failed: {result}")
+                rendered.extend([(None, None)] * len(chunk))
+            else:
+                rendered.extend(result)
+        return rendered
+
+    async def render(self, asset_id, details: dict) -> tuple:
+        return (await self.render_many([(asset_id, details)]))[0]
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
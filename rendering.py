@@ -0,0 +1,188 @@
+import io
+import os
+import tempfile
+from functools import lru_cache
+from typing import List
+
+import qrcode
+from PIL import Image, ImageDraw
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.units import cm
+from reportlab.pdfgen import canvas
+
+# Rendering is kept free of app state (clients, keys, database) so it can be
+# imported cheaply anywhere certificates are drawn.
+
+QR_CACHE_SIZE = int(os.getenv("QR_CACHE_SIZE", "1024"))
+# Optional designed JPEG background; a default one is generated when unset
+CERTIFICATE_BACKGROUND = os.getenv("CERTIFICATE_BACKGROUND", "")
+# Resolution of the generated default background
+TEMPLATE_DPI = int(os.getenv("CERTIFICATE_TEMPLATE_DPI", "100"))
+
+PAGE_SIZE = landscape(A4)
+
+# Write image streams as binary; pure-Python ASCII85 encoding dominates render time otherwise
+rl_config.useA85 = 0
+
+# ------------------- QR Codes -------------------
+def generate_qr_image(asset_id):
+    """Generate QR code image in memory containing just the asset ID."""
+    qr = qrcode.QRCode(version=1, box_size=10, border=4)
+    qr.add_data(str(asset_id))
+    qr.make(fit=True)
+    img = qr.make_image(fill="black", back_color="white")
+    return img
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def generate_qr_png(asset_id) -> bytes:
+    """Render the asset's QR code straight to PNG bytes. Cached per asset ID."""
+    buffer = io.BytesIO()
+    generate_qr_image(asset_id).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def qr_runs(asset_id) -> tuple:
+    """
+    The asset's QR code as (module count, runs), where each run is a
+    (row, start, length) stretch of dark modules, border included, for drawing
+    as vector rectangles. Cached per asset ID.
+    """
+    qr = qrcode.QRCode(version=1, box_size=10, border=4)
+    qr.add_data(str(asset_id))
+    qr.make(fit=True)
+    runs = []
+    for y, row in enumerate(qr.get_matrix()):
+        x = 0
+        while x < len(row):
+            if row[x]:
+                start = x
+                while x < len(row) and row[x]:
+                    x += 1
+                runs.append((y, start, x - start))
+            else:
+                x += 1
+    return len(qr.get_matrix()), tuple(runs)
+
+# ------------------- Certificate Template -------------------
+class CertificateTemplate:
+    """
+    Everything about a certificate that does not depend on the recipient.
+
+    The decorative background is rasterized and JPEG-encoded once and kept as
+    a file: reportlab embeds a JPEG given by path as-is, without decoding or
+    re-compressing it, so each render only pays for the per-recipient text and
+    QR code. Text uses the standard PDF fonts, which need no embedding.
+    """
+    FONT = "Helvetica"
+    FONT_BOLD = "Helvetica-Bold"
+    FONT_ITALIC = "Helvetica-Oblique"
+
+    def __init__(self):
+        self.background_path = CERTIFICATE_BACKGROUND or self._write_default_background()
+
+    def _write_default_background(self) -> str:
+        path = os.path.join(tempfile.gettempdir(), f"poap_certificate_background_{TEMPLATE_DPI}dpi.jpg")
+        if not os.path.exists(path):
+            # Atomic rename so concurrent processes never read a half-written template
+            fd, tmp_path = tempfile.mkstemp(suffix=".jpg", dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._render_background())
+            os.replace(tmp_path, path)
+        return path
+
+    def _render_background(self) -> bytes:
+        width = int(PAGE_SIZE[0] / 72 * TEMPLATE_DPI)
+        height = int(PAGE_SIZE[1] / 72 * TEMPLATE_DPI)
+        image = Image.new("RGB", (width, height), (250, 248, 240))
+        draw = ImageDraw.Draw(image)
+
+        # Soft vertical gradient
+        for y in range(height):
+            shade = int(250 - 18 * y / height)
+            draw.line([(0, y), (width, y)], fill=(shade, shade - 2, shade - 12))
+
+        # Double border with corner accents
+        margin = int(0.8 * TEMPLATE_DPI / 2.54)
+        draw.rectangle([margin, margin, width - margin, height - margin], outline=(20, 120, 110), width=6)
+        inner = margin + 14
+        draw.rectangle([inner, inner, width - inner, height - inner], outline=(190, 160, 70), width=2)
+        accent = 60
+        for x, y in ((inner, inner), (width - inner, inner), (inner, height - inner), (width - inner, height - inner)):
+            draw.ellipse([x - accent // 4, y - accent // 4, x + accent // 4, y + accent // 4], fill=(190, 160, 70))
+
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=85, optimize=True)
+        return buffer.getvalue()
+
+    def render(self, asset_id, details: dict) -> bytes:
+        buffer = io.BytesIO()
+        pdf = canvas.Canvas(buffer, pagesize=PAGE_SIZE, pageCompression=1)
+        self.draw_page(pdf, asset_id, details)
+        pdf.save()
+        return buffer.getvalue()
+
+    def draw_page(self, pdf: canvas.Canvas, asset_id, details: dict):
+        width, height = PAGE_SIZE
+        pdf.drawImage(self.background_path, 0, 0, width=width, height=height)
+
+        pdf.setFillColorRGB(0.08, 0.47, 0.43)
+        pdf.setFont(self.FONT_BOLD, 30)
+        pdf.drawCentredString(width / 2, height - 4 * cm, "Certificate of Participation")
+
+        pdf.setFillColorRGB(0.2, 0.2, 0.2)
+        pdf.setFont(self.FONT_ITALIC, 14)
+        pdf.drawCentredString(width / 2, height - 5.6 * cm, "This certifies that")
+
+        pdf.setFillColorRGB(0.1, 0.1, 0.1)
+        pdf.setFont(self.FONT_BOLD, 26)
+        pdf.drawCentredString(width / 2, height - 7.2 * cm, str(details.get("recipient_name", "")))
+
+        pdf.setFont(self.FONT_ITALIC, 14)
+        pdf.drawCentredString(width / 2, height - 8.6 * cm, "participated in")
+        pdf.setFont(self.FONT_BOLD, 20)
+        pdf.drawCentredString(width / 2, height - 10 * cm, str(details.get("event", "")))
+
+        pdf.setFont(self.FONT, 12)
+        pdf.drawString(3 * cm, 3.6 * cm, f"Organized by: {details.get('organizer', '')}")
+        pdf.drawString(3 * cm, 2.9 * cm, f"Date: {details.get('date', '')}")
+        pdf.setFont(self.FONT, 9)
+        pdf.drawString(3 * cm, 2.2 * cm, f"Algorand asset ID: {asset_id}")
+
+        qr_size = 3.6 * cm
+        qr_x, qr_y = width - 3 * cm - qr_size, 1.8 * cm
+        self.draw_qr(pdf, asset_id, qr_x, qr_y, qr_size)
+        pdf.drawCentredString(qr_x + qr_size / 2, 1.4 * cm, "Scan to verify")
+
+    def draw_qr(self, pdf: canvas.Canvas, asset_id, x: float, y: float, size: float):
+        modules, runs = qr_runs(asset_id)
+        module = size / modules
+        pdf.setFillColorRGB(1, 1, 1)
+        pdf.rect(x, y, size, size, stroke=0, fill=1)
+        pdf.setFillColorRGB(0, 0, 0)
+        path = pdf.beginPath()
+        for row, start, length in runs:
+            path.rect(x + start * module, y + size - (row + 1) * module, length * module, module)
+        pdf.drawPath(path, stroke=0, fill=1)
+
+@lru_cache(maxsize=1)
+def get_certificate_template() -> CertificateTemplate:
+    return CertificateTemplate()
+
+def render_certificate_pdf(asset_id, details: dict) -> bytes:
+    """Render one certificate PDF with the event, organizer, date, recipient and an embedded QR code."""
+    return get_certificate_template().render(asset_id, details)
+
+def render_certificate_pdfs(items: List[tuple]) -> List[bytes]:
+    """Render a batch of (asset_id, details) pairs into one PDF each."""
+    template = get_certificate_template()
+    return [template.render(asset_id, details) for asset_id, details in items]
+
+# ------------------- Render Pool Entry Point -------------------
+def render_batch(items: List[tuple]) -> List[tuple]:
+    """
+    Process-pool entry point: render (asset_id, details) pairs to
+    (qr_png, certificate_pdf) bytes. Each worker keeps its own template and QR caches.
+    """
+    template = get_certificate_template()
+    return [(generate_qr_png(asset_id), template.render(asset_id, details)) for asset_id, details in items]
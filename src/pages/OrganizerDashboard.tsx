@@ -352,7 +352,21 @@ const OrganizerDashboard: React.FC = () => {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
 
-      const result = await response.json();
+      // Minting is queued server-side; poll the job until a worker finishes it
+      const job = await response.json();
+      console.log("Mint job queued:", job);
+
+      let jobStatus = await (await fetch(`http://localhost:8000${job.status_url}`)).json();
+      while (jobStatus.status === "queued" || jobStatus.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        jobStatus = await (await fetch(`http://localhost:8000${job.status_url}`)).json();
+      }
+
+      if (jobStatus.status !== "succeeded") {
+        throw new Error(jobStatus.error || "Minting failed");
+      }
+
+      const result = jobStatus.result;
       console.log("Mint result:", result);
 
       if (result.success) {
@@ -0,0 +1,372 @@
+import http.client
+import json
+import logging
+import random
+import ssl
+import threading
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from algosdk import constants
+from algosdk.error import AlgodHTTPError, AlgodResponseError, IndexerHTTPError
+from algosdk.v2client.algod import AlgodClient, api_version_path_prefix
+from algosdk.v2client.indexer import IndexerClient
+
+from metrics import Counter, Gauge
+
+# Keep-alive transport for algod and the indexer: pooled connections,
+# failover across endpoints, bounded retries and a circuit breaker.
+
+UPSTREAM_FAILURES = Counter(
+    "poap_upstream_failures_total", "Failed attempts per upstream endpoint", ("upstream", "endpoint")
+)
+UPSTREAM_RETRIES = Counter("poap_upstream_retries_total", "Attempts retried after a failure", ("upstream",))
+UPSTREAM_REJECTED = Counter(
+    "poap_upstream_rejected_total", "Calls failed fast while the circuit was open", ("upstream",)
+)
+UPSTREAM_BUSY = Counter(
+    "poap_upstream_busy_total", "Calls refused because the upstream's concurrency cap stayed full", ("upstream",)
+)
+CIRCUIT_OPEN = Gauge("poap_upstream_circuit_open", "1 while the upstream's circuit breaker is open", ("upstream",))
+
+IDEMPOTENT_METHODS = ("GET", "HEAD")
+
+class UpstreamUnavailableError(ConnectionError):
+    """Every endpoint failed, or the circuit is open and the call was not attempted."""
+    def __init__(self, message: str, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class UpstreamBusyError(UpstreamUnavailableError):
+    """Every concurrency slot for the upstream stayed taken for the queue timeout."""
+
+class ConnectFailed(OSError):
+    """The connection could not be opened, so the request was never sent."""
+
+class ConnectionPool:
+    """
+    Idle keep-alive connections to one base URL, reused most-recent first.
+    Concurrency is bounded by the caller's threads; at most `maxsize` idle
+    connections are kept.
+    """
+    def __init__(self, url: str, maxsize: int):
+        parts = urlsplit(url)
+        self.url = url
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.maxsize = maxsize
+        self._idle = []
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context() if self.scheme == "https" else None
+
+    def _new_connection(self, timeout: float) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=timeout, context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        try:
+            conn.connect()
+        except OSError as e:
+            raise ConnectFailed(f"{self.url}: {e}") from e
+        return conn
+
+    def request(self, method: str, path: str, body: Optional[bytes], headers: dict,
+                timeout: float) -> Tuple[int, bytes]:
+        conn = None
+        # A dropped keep-alive connection can fail after the request was written,
+        # so only reads reuse one; writes always go out on a fresh connection
+        if method in IDEMPOTENT_METHODS:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+        if conn is not None:
+            conn.sock.settimeout(timeout)
+            try:
+                return self._send(conn, method, path, body, headers)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server dropped the idle connection before reading the request
+                pass
+        return self._send(self._new_connection(timeout), method, path, body, headers)
+
+    def _send(self, conn, method, path, body, headers) -> Tuple[int, bytes]:
+        try:
+            conn.request(method, self.base_path + path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except BaseException:
+            conn.close()
+            raise
+        if response.will_close:
+            conn.close()
+        else:
+            with self._lock:
+                if len(self._idle) < self.maxsize:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+        return response.status, data
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed calls and rejects
+    calls for `reset_timeout` seconds. After that a single trial call is let
+    through (half-open): success closes the circuit, failure reopens it.
+    """
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self._opened_at >= self.reset_timeout else "open"
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logging.info(f"{self.name} circuit closed")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+        CIRCUIT_OPEN.set(0, upstream=self.name)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or (self._opened_at is None and self._failures >= self.failure_threshold):
+                if self._opened_at is None:
+                    logging.warning(f"{self.name} circuit opened after {self._failures} failed calls")
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+        if self._opened_at is not None:
+            CIRCUIT_OPEN.set(1, upstream=self.name)
+
+class Endpoint:
+    def __init__(self, url: str, pool_size: int):
+        self.url = url
+        self.pool = ConnectionPool(url, pool_size)
+        self.down_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+class UpstreamTransport:
+    """
+    Sends requests to the first healthy endpoint of one service, with a
+    deadline per call.
+
+    A failed endpoint (connection error, timeout or 5xx) is marked down for
+    `cooldown` seconds and the next one is tried. Reads (GET) are retried
+    with full-jitter exponential backoff up to `retries` times; writes fail
+    over only when the connection could not be opened, since then the
+    request was never sent. A call that fails on every attempt counts
+    against the circuit breaker, and while the circuit is open calls raise
+    UpstreamUnavailableError without touching the network.
+
+    At most `max_concurrency` calls are in flight at once; a call that cannot
+    get a slot within `queue_timeout` raises UpstreamBusyError instead of
+    piling more load onto a slow node.
+    """
+    def __init__(self, name: str, urls: List[str], timeout: float, retries: int, backoff: float,
+                 cooldown: float, pool_size: int, breaker: CircuitBreaker, max_concurrency: int,
+                 queue_timeout: float):
+        if not urls:
+            raise ValueError(f"No {name} endpoints configured")
+        self.name = name
+        self.endpoints = [Endpoint(url, pool_size) for url in urls]
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.breaker = breaker
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    @property
+    def urls(self) -> List[str]:
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def _ordered_endpoints(self) -> List[Endpoint]:
+        # Healthy endpoints in configured order, then the ones due back soonest
+        healthy = [e for e in self.endpoints if e.healthy]
+        down = sorted((e for e in self.endpoints if not e.healthy), key=lambda e: e.down_until)
+        return healthy + down
+
+    def _mark_down(self, endpoint: Endpoint, reason):
+        UPSTREAM_FAILURES.inc(upstream=self.name, endpoint=endpoint.url)
+        if endpoint.healthy and len(self.endpoints) > 1:
+            logging.warning(f"{self.name} endpoint {endpoint.url} failed ({reason}); failing over")
+        endpoint.down_until = time.monotonic() + self.cooldown
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None, headers: Optional[dict] = None,
+                timeout: Optional[float] = None, bounded: bool = True) -> Tuple[int, bytes]:
+        """
+        Return (status, body) of the first non-5xx response. 4xx responses are
+        returned, not raised. `bounded=False` skips the concurrency cap, for
+        long polls that hold a connection open without loading the node.
+        """
+        if not bounded:
+            return self._request(method, path, body, headers, timeout)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            UPSTREAM_BUSY.inc(upstream=self.name)
+            raise UpstreamBusyError(f"{self.name} is at its concurrency limit", 1.0)
+        try:
+            return self._request(method, path, body, headers, timeout)
+        finally:
+            self._slots.release()
+
+    def _request(self, method, path, body, headers, timeout) -> Tuple[int, bytes]:
+        if not self.breaker.allow():
+            UPSTREAM_REJECTED.inc(upstream=self.name)
+            retry_after = self.breaker.retry_after()
+            raise UpstreamUnavailableError(f"{self.name} circuit is open; retry in {retry_after:.0f}s", retry_after)
+
+        deadline = time.monotonic() + (timeout or self.timeout)
+        attempts = 1 + (self.retries if method in IDEMPOTENT_METHODS else 0)
+        endpoints = self._ordered_endpoints()
+        last_error, last_response = None, None
+        attempt = 0
+        while True:
+            endpoint = endpoints[attempt % len(endpoints)]
+            remaining = deadline - time.monotonic()
+            try:
+                status, data = endpoint.pool.request(method, path, body, headers or {}, max(remaining, 0.001))
+                if status < 500:
+                    endpoint.down_until = 0.0
+                    self.breaker.record_success()
+                    return status, data
+                last_error, last_response = f"HTTP {status}", (status, data)
+            except (OSError, http.client.HTTPException) as e:
+                last_error, last_response = e, None
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            self._mark_down(endpoint, last_error)
+
+            attempt += 1
+            # A write may only be resent when the failed attempt never reached the server
+            retryable = attempt < attempts or (isinstance(last_error, ConnectFailed) and attempt < len(endpoints))
+            if not retryable:
+                break
+            delay = random.uniform(0, self.backoff * 2 ** (attempt - 1)) if attempt >= len(endpoints) else 0.0
+            if time.monotonic() + delay >= deadline:
+                break
+            UPSTREAM_RETRIES.inc(upstream=self.name)
+            time.sleep(delay)
+
+        self.breaker.record_failure()
+        if last_response is not None:
+            return last_response
+        raise UpstreamUnavailableError(f"{self.name} unreachable: {last_error}", self.breaker.retry_after())
+
+    def state(self) -> dict:
+        return {
+            "circuit": self.breaker.state,
+            "endpoints": [{"url": e.url, "healthy": e.healthy} for e in self.endpoints],
+        }
+
+    def close(self):
+        for endpoint in self.endpoints:
+            endpoint.pool.close()
+
+def build_request_path(requrl: str, params: Optional[dict]) -> str:
+    if requrl not in constants.unversioned_paths:
+        requrl = api_version_path_prefix + requrl
+    if params:
+        requrl = requrl + "?" + urlencode(params)
+    return requrl
+
+def error_message(data: bytes) -> Tuple[str, dict]:
+    text = data.decode("utf-8", errors="replace")
+    try:
+        body = json.loads(text)
+        return body.get("message", text), body
+    except (ValueError, AttributeError):
+        return text, {}
+
+# Long polls are held open by algod for up to a minute, so they get their own deadline
+LONG_POLL_PREFIX = "/status/wait-for-block-after/"
+
+class PooledAlgodClient(AlgodClient):
+    """AlgodClient whose requests go through an UpstreamTransport instead of urllib."""
+    def __init__(self, algod_token: str, transport: UpstreamTransport, headers: Optional[dict] = None,
+                 long_poll_timeout: float = 75.0):
+        super().__init__(algod_token, transport.urls[0], headers)
+        self.transport = transport
+        self.long_poll_timeout = long_poll_timeout
+
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format="json",
+                      timeout=None):
+        header = {"User-Agent": "py-algorand-sdk"}
+        header.update(self.headers or {})
+        header.update(headers or {})
+        if requrl not in constants.no_auth:
+            header[constants.algod_auth_header] = self.algod_token
+        long_poll = requrl.startswith(LONG_POLL_PREFIX)
+        if timeout is None and long_poll:
+            timeout = self.long_poll_timeout
+
+        status, body = self.transport.request(method, build_request_path(requrl, params), data, header, timeout,
+                                              bounded=not long_poll)
+        if status >= 400:
+            message, details = error_message(body)
+            raise AlgodHTTPError(message, status, details.get("data"))
+        if response_format != "json":
+            return body
+        if not body:
+            # Some algod responses are an empty 200
+            return {}
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise AlgodResponseError("Failed to parse JSON response from algod") from e
+
+class PooledIndexerClient(IndexerClient):
+    """IndexerClient whose requests go through an UpstreamTransport instead of urllib."""
+    def __init__(self, indexer_token: str, transport: UpstreamTransport, headers: Optional[dict] = None):
+        super().__init__(indexer_token, transport.urls[0], headers)
+        self.transport = transport
+
+    def indexer_request(self, method, requrl, params=None, data=None, headers=None, timeout=None):
+        header = {"User-Agent": "py-algorand-sdk"}
+        header.update(self.headers or {})
+        header.update(headers or {})
+        if requrl not in constants.no_auth and self.indexer_token:
+            header[constants.indexer_auth_header] = self.indexer_token
+
+        status, body = self.transport.request(method, build_request_path(requrl, params), data, header, timeout)
+        if status >= 400:
+            raise IndexerHTTPError(error_message(body)[0])
+        return json.loads(body)